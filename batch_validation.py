@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    batch_validation.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+
+Description:    This script contains a class that validates batches of GVX records in one
+                pass and reports every bad field instead of stopping at the first one like
+                the GVX_XML_Writer add_* methods do. The checks run column by column with
+                NumPy, numeric columns need no per value work and repeated text values are
+                only checked once
+----------------------------------------------------------------------------------'''
+import inspect
+import numpy as np
+from ngs_xml_writer import GVX_XML_Writer
+from gvx_reader import SECTION_METHODS
+from validation_lookup_and_reformatting import String_Checker
+
+# The checks of the GVX_XML_Writer add_* methods as (field, rule, required). Optional fields are only
+# checked when they are truthy, like the writer does. Fields without a rule are written as given
+VALIDATION_RULES = {
+    "SOURCE_DATA": [
+        ("source_CREATED_DATE", "datetime", True),
+        ("converted_by_CONVERTED_DATE", "datetime", True),
+    ],
+    "PROJECT_INFORMATION": [
+        ("START_DATE", "datetime", True),
+        ("END_DATE", "datetime", True),
+    ],
+    "REFERENCE_SYSTEM": [
+        ("linear_unit_SIGNIFICANT_DIGITS", "integer", False),
+        ("linear_unit_CONVERSION_FACTOR", "double", False),
+        ("angular_unit_SIGNIFICANT_DIGITS", "integer", False),
+        ("angular_unit_CONVERSION_FACTOR", "double", False),
+    ],
+    "EQUIPMENT": [],
+    "SURVEY_SETUP": [
+        ("rtk_IP_PORT", "integer", False),
+    ],
+    "POINT": [
+        ("ARP_HEIGHT", "double", True),
+        ("TILT_COMPENSATOR", "integer", False),
+        ("EPOCH", "double", True),
+        ("LATITUDE", "double", True),
+        ("LONGITUDE", "double", True),
+        ("ELLIPSOIDAL_HEIGHT", "double", True),
+    ] + [(name, "double", False) for name in ("X", "Y", "Z", "SDN", "SDE", "SDU", "PNE", "PNU", "PEU",
+        "SDX", "SDY", "SDZ", "PXY", "PXZ", "PYZ")],
+    "GNSS_VECTOR": [
+        ("UTC_OFFSET", "double", False),
+        ("LEAP_SECONDS", "integer", False),
+        ("EPOCHS_USED", "integer", False),
+        ("ELEVATION", "double", False),
+        ("PDOP_MASK", "double", False),
+        ("RMS", "double", False),
+        ("GDOP", "double", False),
+        ("HDOP", "double", False),
+        ("PDOP", "double", False),
+        ("TDOP", "double", False),
+        ("VDOP", "double", False),
+        ("satellite_TOTAL", "integer", False),
+        ("GPS", "integer", False),
+        ("GLONASS", "integer", False),
+        ("GALILEO", "integer", False),
+        ("QZSS", "integer", False),
+        ("BEIDOU", "integer", False),
+        ("DOWNLOAD_DATE", "datetime", False),
+        ("DX", "double", True),
+        ("DY", "double", True),
+        ("DZ", "double", True),
+        ("CORRECTOR_AGE", "integer", False),
+        ("SDX", "double", True),
+        ("SDY", "double", True),
+        ("SDZ", "double", True),
+        ("PXY", "double", True),
+        ("PXZ", "double", True),
+        ("PYZ", "double", True),
+    ],
+    "SESSION": [
+        ("TOTAL_VECTORS", "integer", True),
+        ("UTC_OFFSET", "double", False),
+        ("LEAP_SECONDS", "integer", False),
+    ],
+}
+
+# Arguments every add_* method needs, leaving one out is reported with the rule "required"
+REQUIRED_FIELDS = {section: [name for name, parameter in inspect.signature(getattr(GVX_XML_Writer, method_name)).parameters.items()
+    if name != "self" and parameter.default is inspect.Parameter.empty] for section, method_name in SECTION_METHODS.items()}
+
+
+# This is the batch validator. Records are given either as a list of dictionaries of add_* keyword arguments
+# or as columns, a dictionary of field name to a list or NumPy array with one value per record. Every error
+# is reported as {"index", "id", "field", "value", "rule"} sorted by record index
+#---------------------------------------------------------------------------------------------------------------
+class Batch_Validator():
+
+    def __init__(self):
+        string_checker = String_Checker()
+        self.checkers = {
+            "double": string_checker.is_float,
+            "integer": string_checker.is_int,
+            "datetime": string_checker.is_valid_datetime,
+        }
+        self.results = {rule: {} for rule in self.checkers}
+
+    # Checks a single value with the writer's String_Checker, values the checker can not take at all,
+    # e.g. None for a double, are invalid like they are in the add_* methods. Results are kept per value
+    def check_value(self, rule, value):
+        try:
+            results = self.results[rule]
+            if value in results:
+                return results[value]
+        except TypeError:
+            results = None
+        try:
+            valid = self.checkers[rule](value)
+        except (TypeError, ValueError):
+            valid = False
+        if results is not None:
+            results[value] = valid
+        return valid
+
+    # Returns a boolean mask of the values of a column that fail a rule, checked marks the values the
+    # rule applies to
+    def invalid_values(self, column, rule, checked):
+        invalid = np.zeros(len(column), dtype=bool)
+        if not checked.any():
+            return invalid
+        if column.dtype.kind in "biuf":
+            if rule == "datetime":
+                invalid[checked] = True
+            return invalid
+        if column.dtype.kind == "U":
+            values, inverse = np.unique(column[checked], return_inverse=True)
+            valid = np.array([self.check_value(rule, str(value)) for value in values], dtype=bool)
+            invalid[checked] = ~valid[inverse]
+            return invalid
+        check = np.frompyfunc(lambda value: self.check_value(rule, value), 1, 1)
+        invalid[checked] = ~check(column[checked]).astype(bool)
+        return invalid
+
+    # Boolean mask of the truthy values of a column
+    def truthy_values(self, column):
+        if column.dtype.kind in "biuf":
+            return column != 0
+        if column.dtype.kind == "U":
+            return column != ""
+        return np.frompyfunc(bool, 1, 1)(column).astype(bool)
+
+    def none_values(self, column):
+        if column.dtype != object:
+            return np.zeros(len(column), dtype=bool)
+        return np.frompyfunc(lambda value: value is None, 1, 1)(column).astype(bool)
+
+    def as_column(self, values, count):
+        if values is None:
+            return np.full(count, None, dtype=object)
+        if isinstance(values, np.ndarray) and values.dtype.kind in "biufU":
+            return values
+        column = np.empty(count, dtype=object)
+        column[:] = list(values)
+        return column
+
+    # Checks the columns of a batch of records, absent holds a mask per field of the records that leave
+    # the field out. Returns the errors sorted by record index
+    def check_columns(self, section, columns, absent, count):
+        columns = {name: self.as_column(values, count) for name, values in columns.items()}
+        blank = np.full(count, None, dtype=object)
+        everywhere = np.ones(count, dtype=bool)
+        errors = []
+        for name in REQUIRED_FIELDS[section]:
+            for index in np.flatnonzero(absent.get(name, everywhere)):
+                errors.append((int(index), name, None, "required"))
+
+        # The geodetic coordinates of a point may be left out when X, Y and Z are given
+        exempt = np.zeros(count, dtype=bool)
+        if section == "POINT":
+            exempt = ~exempt
+            for name in ("LATITUDE", "LONGITUDE", "ELLIPSOIDAL_HEIGHT"):
+                exempt &= self.none_values(columns.get(name, blank))
+            for name in ("X", "Y", "Z"):
+                exempt &= self.truthy_values(columns.get(name, blank))
+
+        for name, rule, required in VALIDATION_RULES[section]:
+            values = columns.get(name, blank)
+            if required:
+                checked = ~absent.get(name, everywhere)
+                if name in ("LATITUDE", "LONGITUDE", "ELLIPSOIDAL_HEIGHT"):
+                    checked &= ~exempt
+            else:
+                checked = self.truthy_values(values)
+            for index in np.flatnonzero(self.invalid_values(values, rule, checked)):
+                errors.append((int(index), name, self.python_value(values[index]), rule))
+
+        errors.sort(key=lambda error: error[0])
+        ids = columns.get("ID")
+        return [{
+            "index": index,
+            "id": None if ids is None else self.python_value(ids[index]),
+            "field": name,
+            "value": value,
+            "rule": rule,
+        } for index, name, value, rule in errors]
+
+    def python_value(self, value):
+        return value.item() if isinstance(value, np.generic) else value
+
+    # Validates a batch of records of one section given as columns, a dictionary of field name to a list or
+    # NumPy array with one value per record. Fields missing from columns are missing from every record
+    def validate_columns(self, section, columns):
+        count = len(next(iter(columns.values()))) if columns else 0
+        for name, values in columns.items():
+            if len(values) != count:
+                raise Exception("Column {} has {} values, expected {}".format(name, len(values), count))
+        nowhere = np.zeros(count, dtype=bool)
+        return self.check_columns(section, columns, {name: nowhere for name in columns}, count)
+
+    # Validates a list of records of one section, each a dictionary of add_* keyword arguments
+    def validate(self, section, records):
+        names = set()
+        for record in records:
+            names.update(record)
+        columns = {name: [record.get(name) for record in records] for name in names}
+        absent = {name: np.array([name not in record for record in records], dtype=bool) for name in names}
+        return self.check_columns(section, columns, absent, len(records))
+
+    # Validates the records and adds the ones without errors to the writer in their original order. Records
+    # the rules pass but the writer still rejects are reported with the rule "writer" and the exception text
+    # as their value
+    def add_valid_records(self, writer, section, records):
+        errors = self.validate(section, records)
+        bad = set(error["index"] for error in errors)
+        add = getattr(writer, SECTION_METHODS[section])
+        for index, record in enumerate(records):
+            if index in bad:
+                continue
+            try:
+                add(**record)
+            except Exception as ex:
+                errors.append({"index": index, "id": record.get("ID"), "field": None, "value": str(ex), "rule": "writer"})
+        errors.sort(key=lambda error: error["index"])
+        return errors
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    benchmarks.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete, bluebook conversion benchmark
+                2026/10/19 - Added the coordinate conversion benchmark
+                2026/10/19 - Added the GVXB against GVX size and speed benchmark
+                2026/10/19 - Added the parallel serialization benchmark
+                2026/10/19 - Added the per file latency benchmark of the reusable writer
+                2026/10/19 - Added the benchmark of the writer methods that fill in point coordinates
+
+Description:    This script times the throughput critical parts of the package on synthetic
+                data and prints the results. Run it directly, python benchmarks.py
+----------------------------------------------------------------------------------'''
+import os, tempfile, time
+import numpy as np
+import xml.etree.ElementTree as ET
+from ngs_xml_writer import GVX_XML_Writer, GVX_Stream_Writer, GVX_Reusable_Writer, HEADER_ORDER
+from bluebook_converter import Bluebook_Converter
+from geodesy import Coordinate_Converter
+from gvx_reader import GVX_Reader, SECTION_METHODS
+from gvx_binary import GVX_Binary_Writer, GVX_Binary_Reader
+from gvx_parallel import GVX_Parallel_Writer
+
+
+# Builds a writer with the header, equipment and survey setup records every benchmark needs
+def header_writer(writer):
+    writer.add_source_data("Benchmark", "benchmarks.py", "ngs_xml", "2021-01-01T00:00:00.00", "2021-01-01T00:00:00.00", "1.0")
+    writer.add_project_information("Benchmark", "Party Chief", "NGS", "2021-01-01T00:00:00.00", "2021-01-02T00:00:00.00")
+    writer.add_reference_system("NAD83_2011_2010.00", "NAD 83(2011)", "degree", "meter")
+    writer.add_equipment("EQ1", "RECEIVER", "0001", "1.0", "ANTENNA", "0001")
+    writer.add_survey_setup("SS1", "Post-processed", "Operator", "OPUS-Projects", "5.0")
+    return writer
+
+
+# Writes a B-file with one *80* and *86* record per station and a G-file with one B, C and D record per vector
+def write_synthetic_bluebook(directory, stations, vectors):
+    b_filepath = os.path.join(directory, "synthetic.b")
+    g_filepath = os.path.join(directory, "synthetic.g")
+    with open(b_filepath, "w") as b_file:
+        for i in range(stations):
+            ssn = "{:04d}".format(i % 10000)
+            b_file.write("{:06d}*80*{}{:<30}{:011d}N{:012d}W\n".format(i, ssn, "STATION " + ssn, 38123456789, 77123456789))
+            b_file.write("{:06d}*86*{}{:31}{:7d}\n".format(i, ssn, "", 12345))
+    with open(g_filepath, "w") as g_file:
+        for i in range(vectors):
+            if i % 100 == 0:
+                g_file.write("B{}{}P{:27}33\n".format("202101011200", "202101011600", ""))
+            g_file.write("C{:04d}{:04d}{:11d}{:5d}{:11d}{:5d}{:11d}{:5d}\n".format(
+                i % stations, (i + 1) % stations, 123456789, 12, -23456789, 15, 34567891, 20))
+            g_file.write("D{:04d}{:04d}{:9d}{:9d}{:9d}\n".format(i % stations, (i + 1) % stations, -1234567, 2345678, -3456789))
+    return b_filepath, g_filepath
+
+
+def benchmark_bluebook_conversion(stations = 5000, vectors = 100000):
+    with tempfile.TemporaryDirectory() as directory:
+        b_filepath, g_filepath = write_synthetic_bluebook(directory, stations, vectors)
+        writer = header_writer(GVX_Stream_Writer(os.path.join(directory, "synthetic.gvx")))
+        converter = Bluebook_Converter(writer, "EQ1", "SS1", "NAD83_2011_2010.00", "2010.0")
+        points, vectors, seconds = converter.convert(b_filepath, g_filepath)
+    print("Bluebook conversion: {} points and {} vectors in {:.2f} s, {:.0f} records/second".format(
+        points, vectors, seconds, (points + vectors) / seconds))
+
+
+def benchmark_coordinate_conversion(points = 2000000):
+    converter = Coordinate_Converter()
+    random = np.random.default_rng(0)
+    latitude = random.uniform(17.0, 72.0, points)
+    longitude = random.uniform(-180.0, -64.0, points)
+    height = random.uniform(-100.0, 4500.0, points)
+    start_time = time.perf_counter()
+    x, y, z = converter.geodetic_to_geocentric(latitude, longitude, height)
+    to_geocentric = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    converter.geocentric_to_geodetic(x, y, z)
+    to_geodetic = time.perf_counter() - start_time
+    print("Geodetic to geocentric: {:.0f} conversions/second".format(points / to_geocentric))
+    print("Geocentric to geodetic: {:.0f} conversions/second".format(points / to_geodetic))
+
+
+# Times the writer methods that fill in coordinates, add_point with only X, Y and Z derives the geodetic
+# coordinates of each point as it is added and fill_point_coordinates derives the geocentric coordinates of
+# all points in one pass, which includes walking the tree to read and write the element texts
+def benchmark_point_coordinates(points = 100000):
+    writer = header_writer(GVX_XML_Writer(None))
+    start_time = time.perf_counter()
+    for i in range(points):
+        writer.add_point(str(i), "POINT " + str(i), "EQ1", "1.5", "Adjusted", "NAD83_2011_2010.00", "2010.0",
+            "38.1234567890", "-77.1234567890", "12.3456")
+    geodetic_given = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    writer.fill_point_coordinates()
+    fill = time.perf_counter() - start_time
+    writer = header_writer(GVX_XML_Writer(None))
+    start_time = time.perf_counter()
+    for i in range(points):
+        writer.add_point(str(i), "POINT " + str(i), "EQ1", "1.5", "Adjusted", "NAD83_2011_2010.00", "2010.0",
+            None, None, None, X="1115048.5432", Y="-4843938.1111", Z="3983240.2222")
+    geocentric_given = time.perf_counter() - start_time
+    print("add_point: {:.1f} us per point with geodetic coordinates, {:.1f} us per point with only X, Y and Z".format(
+        geodetic_given / points * 1e6, geocentric_given / points * 1e6))
+    print("fill_point_coordinates: {} points in {:.2f} s, {:.1f} us per point, {:.0f} points/second".format(
+        points, fill, fill / points * 1e6, points / fill))
+
+
+
+# Encodes and decodes the same records as GVX and GVXB. Both encoders start from records that are already
+# validated, the XML side serializes the built elements and the GVXB side encodes the keyword dictionaries
+def benchmark_binary_format(stations = 5000, vectors = 50000):
+    with tempfile.TemporaryDirectory() as directory:
+        b_filepath, g_filepath = write_synthetic_bluebook(directory, stations, vectors)
+        gvx_filepath = os.path.join(directory, "synthetic.gvx")
+        gvxb_filepath = os.path.join(directory, "synthetic.gvxb")
+        writer = header_writer(GVX_Stream_Writer(gvx_filepath))
+        Bluebook_Converter(writer, "EQ1", "SS1", "NAD83_2011_2010.00", "2010.0").convert(b_filepath, g_filepath)
+
+        start_time = time.perf_counter()
+        records = list(GVX_Reader(gvx_filepath).iter_records())
+        xml_decode = time.perf_counter() - start_time
+
+        binary_writer = GVX_Binary_Writer(gvxb_filepath)
+        start_time = time.perf_counter()
+        for section, record in records:
+            if section in HEADER_ORDER:
+                getattr(binary_writer, SECTION_METHODS[section])(**record)
+            else:
+                binary_writer.write_record(section, record)
+        binary_writer.write_file()
+        binary_encode = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        binary_records = list(GVX_Binary_Reader(gvxb_filepath).iter_records())
+        binary_decode = time.perf_counter() - start_time
+        if binary_records != records:
+            raise Exception("GVXB records do not match the GVX records")
+
+        elements = list(ET.parse(gvx_filepath).getroot())
+        start_time = time.perf_counter()
+        with open(os.path.join(directory, "copy.gvx"), "wb") as gvx_file:
+            gvx_file.writelines(ET.tostring(element) for element in elements)
+        xml_encode = time.perf_counter() - start_time
+
+        gvx_size = os.path.getsize(gvx_filepath)
+        gvxb_size = os.path.getsize(gvxb_filepath)
+    print("GVX {} bytes, GVXB {} bytes, {:.1f}x smaller".format(gvx_size, gvxb_size, gvx_size / gvxb_size))
+    print("Encode {} records: GVX {:.2f} s, GVXB {:.2f} s".format(len(records), xml_encode, binary_encode))
+    print("Decode {} records: GVX {:.2f} s, GVXB {:.2f} s".format(len(records), xml_decode, binary_decode))
+
+
+# Writes the same in memory document with GVX_XML_Writer.write_file and with GVX_Parallel_Writer on 1 to all CPUs
+def benchmark_parallel_serialization(points = 100000, vectors = 400000):
+    with tempfile.TemporaryDirectory() as directory:
+        writer = header_writer(GVX_Parallel_Writer(os.path.join(directory, "parallel.gvx")))
+        for i in range(points):
+            writer.add_point(str(i), "POINT " + str(i), "EQ1", "1.5", "Adjusted", "NAD83_2011_2010.00", "2010.0",
+                "38.1234567890", "-77.1234567890", "12.3456")
+        for i in range(vectors):
+            writer.add_gnss_vector(str(i), str(i % points), str((i + 1) % points), "SS1", "2021-01-01T12:00:00.00",
+                "2021-01-01T16:00:00.00", "Precise", "IGS", "1234.5678", "-2345.6789", "3456.7891", "0.0012", "0.0015", "0.0020",
+                "0.1234567", "-0.2345678", "0.3456789")
+        writer.filepath = os.path.join(directory, "sequential.gvx")
+        start_time = time.perf_counter()
+        GVX_XML_Writer.write_file(writer)
+        sequential = time.perf_counter() - start_time
+        print("Serialize {} records: ElementTree.write {:.2f} s".format(points + vectors, sequential))
+        with open(writer.filepath, "rb") as gvx_file:
+            expected = gvx_file.read()
+        writer.filepath = os.path.join(directory, "parallel.gvx")
+        processes = 1
+        while processes <= (os.cpu_count() or 1):
+            writer.processes = processes
+            start_time = time.perf_counter()
+            writer.write_file()
+            seconds = time.perf_counter() - start_time
+            with open(writer.filepath, "rb") as gvx_file:
+                if gvx_file.read() != expected:
+                    raise Exception("Parallel output does not match ElementTree.write")
+            print("Serialize {} records: {} processes {:.2f} s, {:.1f}x".format(points + vectors, processes, seconds, sequential / seconds))
+            processes *= 2
+
+
+# Builds files of one RTK vector each with a new GVX_XML_Writer per file and with one GVX_Reusable_Writer that is
+# reset between files, once in memory only and once written to disk
+def benchmark_small_file_latency(files = 2000):
+    def add_vector(writer, i):
+        writer.add_gnss_vector(str(i), "1", "2", "SS1", "2021-01-01T12:00:00.00", "2021-01-01T12:00:05.00", "RTK", "Broadcast",
+            "1234.5678", "-2345.6789", "3456.7891", "0.0012", "0.0015", "0.0020", "0.1234567", "-0.2345678", "0.3456789")
+    def new_writer_file(filepath, i, write):
+        writer = header_writer(GVX_XML_Writer(filepath))
+        add_vector(writer, i)
+        return writer.write_file() if write else ET.tostring(writer.root)
+    reused = None
+    def reused_writer_file(filepath, i, write):
+        reused.reset(filepath)
+        add_vector(reused, i)
+        return reused.write_file() if write else reused.document_bytes()
+    with tempfile.TemporaryDirectory() as directory:
+        reused = header_writer(GVX_Reusable_Writer(os.path.join(directory, "reused.gvx")))
+        if new_writer_file(reused.filepath, 0, False) != reused_writer_file(reused.filepath, 0, False):
+            raise Exception("Reused writer output does not match GVX_XML_Writer")
+        for write, label in ((False, "in memory"), (True, "written")):
+            latencies = []
+            for build_file in (new_writer_file, reused_writer_file):
+                start_time = time.perf_counter()
+                for i in range(files):
+                    build_file(os.path.join(directory, "{}.gvx".format(i % 100)), i, write)
+                latencies.append((time.perf_counter() - start_time) / files * 1e6)
+            print("One vector files {}: new writer {:.0f} us per file, reused writer {:.0f} us per file, {:.1f}x".format(
+                label, latencies[0], latencies[1], latencies[0] / latencies[1]))
+
+if __name__ == "__main__":
+    benchmark_bluebook_conversion()
+    benchmark_coordinate_conversion()
+    benchmark_point_coordinates()
+    benchmark_binary_format()
+    benchmark_parallel_serialization()
+    benchmark_small_file_latency()
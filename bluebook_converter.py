@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    bluebook_converter.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+
+Description:    This script contains a class to convert NGS bluebook station (B-file) and
+                vector (G-file) records into a GVX file. Both files are read one line at
+                a time and the GVX is written with the streaming writer so memory use is
+                bounded by the number of stations, not the size of the inputs
+----------------------------------------------------------------------------------'''
+import time
+from operator import itemgetter
+from validation_lookup_and_reformatting import ISO_Lookup, String_Reformatter
+
+# Fixed column layouts of the records that are converted, the key is the record code and the value
+# is a list of (field name, 0 based slice) pairs. Columns follow the bluebook annexes, 1 based
+# columns 11-14 are slice(10, 14). Each layout is compiled into a single itemgetter below so a
+# record is split into all of its fields in one call
+#---------------------------------------------------------------------------------------------------------------
+B_FILE_LAYOUTS = {
+    # *80* control point record, position to 5 decimal places of arc seconds
+    "*80*": [("SSN", slice(10, 14)),
+             ("NAME", slice(14, 44)),
+             ("LATITUDE", slice(44, 55)),
+             ("LATITUDE_DIRECTION", slice(55, 56)),
+             ("LONGITUDE", slice(56, 68)),
+             ("LONGITUDE_DIRECTION", slice(68, 69))],
+    # *86* height record, ellipsoid height in mm when no decimal point is given
+    "*86*": [("SSN", slice(10, 14)),
+             ("ELLIPSOIDAL_HEIGHT", slice(45, 52))],
+}
+
+G_FILE_LAYOUTS = {
+    # B record, session times as YYYYMMDDhhmm, orbit source code and orbit reference frame code
+    "B": [("START", slice(1, 13)),
+          ("END", slice(13, 25)),
+          ("ORBIT_CODE", slice(25, 26)),
+          ("REFERENCE_FRAME", slice(53, 55))],
+    # C record, ECEF deltas with 4 implied decimals and standard deviations with 4 implied decimals
+    "C": [("FROM_SSN", slice(1, 5)),
+          ("TO_SSN", slice(5, 9)),
+          ("DX", slice(9, 20)),
+          ("SDX", slice(20, 25)),
+          ("DY", slice(25, 36)),
+          ("SDY", slice(36, 41)),
+          ("DZ", slice(41, 52)),
+          ("SDZ", slice(52, 57))],
+    # D record, correlation coefficients with 7 implied decimals
+    "D": [("FROM_SSN", slice(1, 5)),
+          ("TO_SSN", slice(5, 9)),
+          ("PXY", slice(9, 18)),
+          ("PXZ", slice(18, 27)),
+          ("PYZ", slice(27, 36))],
+}
+
+# Implied decimal places of the numeric G-file fields
+G_FILE_DECIMALS = {"DX": 4, "DY": 4, "DZ": 4, "SDX": 4, "SDY": 4, "SDZ": 4, "PXY": 7, "PXZ": 7, "PYZ": 7}
+
+# B record orbit source codes and the GVX orbit TYPE and SOURCE they correspond to
+ORBIT_CODES = {
+    "B": ["Broadcast", "Broadcast ephemeris"],
+    "P": ["Final", "IGS final precise ephemeris"],
+    "R": ["Rapid", "IGS rapid precise ephemeris"],
+    "U": ["Ultra-rapid observed half", "IGS ultra-rapid ephemeris"],
+}
+
+
+def compile_layouts(layouts):
+    compiled = {}
+    for code, fields in layouts.items():
+        names = tuple(name for name, column_slice in fields)
+        compiled[code] = (names, itemgetter(*[column_slice for name, column_slice in fields]))
+    return compiled
+
+
+class Bluebook_Converter():
+
+    # The writer is expected to be a GVX_Stream_Writer that already holds the SOURCE_DATA, PROJECT_INFORMATION,
+    # REFERENCE_SYSTEM, EQUIPMENT and SURVEY_SETUP records, the converter adds the POINT and GNSS_VECTOR records
+    def __init__(self,
+    writer,
+    EQUIPMENT_ID,
+    SURVEY_SETUP_ID,
+    REFERENCE_SYSTEM_ID,
+    EPOCH,
+    ARP_HEIGHT = 0.0,
+    POINT_TYPE = "Adjusted"):
+        self.writer = writer
+        self.EQUIPMENT_ID = EQUIPMENT_ID
+        self.SURVEY_SETUP_ID = SURVEY_SETUP_ID
+        self.REFERENCE_SYSTEM_ID = REFERENCE_SYSTEM_ID
+        self.EPOCH = EPOCH
+        self.ARP_HEIGHT = ARP_HEIGHT
+        self.POINT_TYPE = POINT_TYPE
+        self.iso_lookup = ISO_Lookup()
+        self.string_reformatter = String_Reformatter()
+        self.b_file_layouts = compile_layouts(B_FILE_LAYOUTS)
+        self.g_file_layouts = compile_layouts(G_FILE_LAYOUTS)
+        self.reference_frames = {}
+
+    # Converts a bluebook packed angle, DDMMSSsssss or DDDMMSSsssss, to decimal degrees
+    def packed_angle_to_degrees(self, packed, direction, degree_digits):
+        degrees = int(packed[0:degree_digits])
+        minutes = int(packed[degree_digits:degree_digits + 2])
+        seconds = int(packed[degree_digits + 2:]) / 10 ** (len(packed) - degree_digits - 4)
+        decimal_degrees = degrees + minutes / 60.0 + seconds / 3600.0
+        if direction in ("S", "W"):
+            decimal_degrees = -decimal_degrees
+        return decimal_degrees
+
+    # Numeric fields without a decimal point carry implied decimal places
+    def implied_decimal(self, field, decimals):
+        field = field.strip()
+        if "." in field:
+            return float(field)
+        return int(field) / 10 ** decimals
+
+    def split_record(self, line, layout):
+        names, getter = layout
+        return dict(zip(names, getter(line)))
+
+    # Reads the *80* and *86* records of a B-file and returns a dictionary of stations keyed by SSN
+    def read_b_file(self, b_filepath):
+        stations = {}
+        control_point = self.b_file_layouts["*80*"]
+        height = self.b_file_layouts["*86*"]
+        with open(b_filepath, "r", encoding="ascii", errors="replace", buffering=1048576) as b_file:
+            for line in b_file:
+                code = line[6:10]
+                if code == "*80*":
+                    fields = self.split_record(line, control_point)
+                    station = stations.setdefault(fields["SSN"].strip(), {})
+                    station["NAME"] = fields["NAME"].strip()
+                    station["LATITUDE"] = self.packed_angle_to_degrees(fields["LATITUDE"].strip(), fields["LATITUDE_DIRECTION"], 2)
+                    station["LONGITUDE"] = self.packed_angle_to_degrees(fields["LONGITUDE"].strip(), fields["LONGITUDE_DIRECTION"], 3)
+                elif code == "*86*":
+                    fields = self.split_record(line, height)
+                    if fields["ELLIPSOIDAL_HEIGHT"].strip():
+                        station = stations.setdefault(fields["SSN"].strip(), {})
+                        station["ELLIPSOIDAL_HEIGHT"] = self.implied_decimal(fields["ELLIPSOIDAL_HEIGHT"], 3)
+        return stations
+
+    # Looks up the ISO id of a bluebook reference frame code once per code
+    def reference_frame_id(self, code):
+        if code not in self.reference_frames:
+            self.reference_frames[code] = self.iso_lookup.bluebook_ref_id_to_iso_id(code)[0]
+        return self.reference_frames[code]
+
+    # Yields the keyword arguments of add_gnss_vector for every C record of a G-file, the times and orbit
+    # come from the preceding B record and the correlations from the D record that follows the C record
+    def iter_g_file(self, g_filepath):
+        session = None
+        vector = None
+        vector_count = 0
+        session_layout = self.g_file_layouts["B"]
+        vector_layout = self.g_file_layouts["C"]
+        correlation_layout = self.g_file_layouts["D"]
+        with open(g_filepath, "r", encoding="ascii", errors="replace", buffering=1048576) as g_file:
+            for line in g_file:
+                code = line[0:1]
+                if code == "B" or code == "C":
+                    if vector is not None:
+                        yield vector
+                        vector = None
+                if code == "B":
+                    fields = self.split_record(line, session_layout)
+                    orbit = ORBIT_CODES.get(fields["ORBIT_CODE"].strip(), ORBIT_CODES["P"])
+                    session = {
+                        "START": self.string_reformatter.date_formatter(fields["START"], False),
+                        "END": self.string_reformatter.date_formatter(fields["END"], False),
+                        "orbit_TYPE": orbit[0],
+                        "orbit_SOURCE": orbit[1],
+                        "REFERENCE_SYSTEM_ID": self.reference_frame_id(fields["REFERENCE_FRAME"].strip()),
+                    }
+                elif code == "C":
+                    if session is None:
+                        raise Exception("G-file C record found before any B record")
+                    fields = self.split_record(line, vector_layout)
+                    vector_count += 1
+                    vector = dict(session)
+                    vector["ID"] = "V{}".format(vector_count)
+                    vector["INITIAL_POINT_ID"] = fields["FROM_SSN"].strip()
+                    vector["TERMINAL_POINT_ID"] = fields["TO_SSN"].strip()
+                    vector["SURVEY_SETUP_ID"] = self.SURVEY_SETUP_ID
+                    for name in ("DX", "DY", "DZ", "SDX", "SDY", "SDZ"):
+                        vector[name] = "{:.4f}".format(self.implied_decimal(fields[name], G_FILE_DECIMALS[name]))
+                    vector["PXY"] = vector["PXZ"] = vector["PYZ"] = "0.0000000"
+                elif code == "D" and vector is not None:
+                    fields = self.split_record(line, correlation_layout)
+                    for name in ("PXY", "PXZ", "PYZ"):
+                        if fields[name].strip():
+                            vector[name] = "{:.7f}".format(self.implied_decimal(fields[name], G_FILE_DECIMALS[name]))
+        if vector is not None:
+            yield vector
+
+    # Converts a B-file and G-file pair and finishes the GVX file, returns the number of POINT and
+    # GNSS_VECTOR records written and the elapsed time in seconds
+    def convert(self, b_filepath, g_filepath):
+        start_time = time.perf_counter()
+        points = 0
+        vectors = 0
+        for ssn, station in self.read_b_file(b_filepath).items():
+            if "LATITUDE" not in station or "ELLIPSOIDAL_HEIGHT" not in station:
+                print("WARNING! Station {} has no position or ellipsoid height and was not converted".format(ssn))
+                continue
+            self.writer.add_point(
+                ID = ssn,
+                NAME = station["NAME"],
+                EQUIPMENT_ID = self.EQUIPMENT_ID,
+                ARP_HEIGHT = self.ARP_HEIGHT,
+                POINT_TYPE = self.POINT_TYPE,
+                REFERENCE_SYSTEM_ID = self.REFERENCE_SYSTEM_ID,
+                EPOCH = self.EPOCH,
+                LATITUDE = "{:.10f}".format(station["LATITUDE"]),
+                LONGITUDE = "{:.10f}".format(station["LONGITUDE"]),
+                ELLIPSOIDAL_HEIGHT = "{:.4f}".format(station["ELLIPSOIDAL_HEIGHT"]))
+            points += 1
+        for vector in self.iter_g_file(g_filepath):
+            self.writer.add_gnss_vector(**vector)
+            vectors += 1
+        self.writer.write_file()
+        return points, vectors, time.perf_counter() - start_time
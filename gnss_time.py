@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gnss_time.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+
+Description:    This script contains a class with NumPy vectorized conversions between UTC,
+                GPS time and GPS week and seconds of week, the leap second lookup for the
+                LEAP_SECONDS elements and formatting to the dateTime format of the xmls.
+                It complements String_Reformatter, which reformats single date strings.
+                Each distinct epoch of a batch is formatted once
+----------------------------------------------------------------------------------'''
+import numpy as np
+
+GPS_EPOCH = np.datetime64("1980-01-06T00:00:00", "ns")
+SECONDS_PER_WEEK = 604800
+
+# UTC dates from which GPS time is ahead of UTC by the given number of seconds, GPS - UTC was 0 at the GPS
+# epoch. Add a row when the IERS announces a new leap second in Bulletin C
+LEAP_SECOND_TABLE = (
+    ("1981-07-01", 1),
+    ("1982-07-01", 2),
+    ("1983-07-01", 3),
+    ("1985-07-01", 4),
+    ("1988-01-01", 5),
+    ("1990-01-01", 6),
+    ("1991-01-01", 7),
+    ("1992-07-01", 8),
+    ("1993-07-01", 9),
+    ("1994-07-01", 10),
+    ("1996-01-01", 11),
+    ("1997-07-01", 12),
+    ("1999-01-01", 13),
+    ("2006-01-01", 14),
+    ("2009-01-01", 15),
+    ("2012-07-01", 16),
+    ("2015-07-01", 17),
+    ("2017-01-01", 18),
+)
+
+
+class GNSS_Time_Converter():
+    def __init__(self):
+        self.leap_second_counts = np.array([0] + [count for date, count in LEAP_SECOND_TABLE], dtype=np.int64)
+        self.utc_steps = np.array([date for date, count in LEAP_SECOND_TABLE], dtype="datetime64[ns]")
+        # The same steps on the GPS time scale, the first GPS second after each leap second
+        self.gps_steps = self.utc_steps + self.leap_second_counts[1:] * np.timedelta64(1000000000, "ns")
+
+    # Strings in the xml dateTime format or any other ISO 8601 form NumPy reads, datetime objects or
+    # datetime64 values to a datetime64[ns] array. Strings that can not be read become NaT
+    def parse_datetimes(self, values):
+        values = np.asarray(values)
+        if values.dtype.kind == "M":
+            return values.astype("datetime64[ns]")
+        if values.dtype.kind == "O" and values.size and not isinstance(values.flat[0], str):
+            return values.astype("datetime64[ns]")
+        values = values.astype(str)
+        try:
+            return values.astype("datetime64[ns]")
+        except ValueError:
+            pass
+        # Some strings can not be read, each distinct string is read on its own so only those become NaT
+        uniques, inverse = np.unique(values, return_inverse=True)
+        parsed = np.empty(len(uniques), dtype="datetime64[ns]")
+        for i, text in enumerate(uniques):
+            try:
+                parsed[i] = np.datetime64(text.strip(), "ns")
+            except ValueError:
+                parsed[i] = np.datetime64("NaT", "ns")
+        return parsed[inverse].reshape(values.shape)
+
+    # GPS - UTC in whole seconds at UTC times
+    def leap_seconds_at_utc(self, utc):
+        utc = self.parse_datetimes(utc)
+        return self.leap_second_counts[np.searchsorted(self.utc_steps, utc, side="right")]
+
+    # GPS - UTC in whole seconds at GPS times
+    def leap_seconds_at_gps(self, gps):
+        gps = self.parse_datetimes(gps)
+        return self.leap_second_counts[np.searchsorted(self.gps_steps, gps, side="right")]
+
+    def utc_to_gps(self, utc):
+        utc = self.parse_datetimes(utc)
+        return utc + self.leap_seconds_at_utc(utc) * np.timedelta64(1000000000, "ns")
+
+    def gps_to_utc(self, gps):
+        gps = self.parse_datetimes(gps)
+        return gps - self.leap_seconds_at_gps(gps) * np.timedelta64(1000000000, "ns")
+
+    # GPS week numbers, not rolled over, and seconds of week to GPS times
+    def week_seconds_to_gps(self, week, seconds):
+        week = np.asarray(week, dtype=np.int64)
+        nanoseconds = np.round(np.asarray(seconds, dtype=np.float64) * 1e9).astype(np.int64)
+        return GPS_EPOCH + (week * SECONDS_PER_WEEK * 1000000000 + nanoseconds).astype("timedelta64[ns]")
+
+    # GPS times to GPS week numbers and seconds of week
+    def gps_to_week_seconds(self, gps):
+        nanoseconds = (self.parse_datetimes(gps) - GPS_EPOCH).astype(np.int64)
+        week, remainder = np.divmod(nanoseconds, SECONDS_PER_WEEK * 1000000000)
+        return week, remainder / 1e9
+
+    # Times to strings in the xml dateTime format YYYY-MM-DDThh:mm:ss.ss, rounded to the hundredth of a
+    # second. NaT becomes an empty string
+    def format_datetimes(self, times):
+        times = self.parse_datetimes(times)
+        uniques, inverse = np.unique(times, return_inverse=True)
+        rounded = ((uniques.astype(np.int64) + 5000000) // 10000000 * 10000000).astype("datetime64[ns]")
+        strings = np.datetime_as_string(rounded.astype("datetime64[ms]"), unit="ms").astype("U22")
+        strings[np.isnat(uniques)] = ""
+        return strings[inverse].reshape(times.shape)
+
+    # Converts batches of observation start and end times to the GPS START, END and LEAP_SECONDS strings of
+    # GNSS_VECTOR and SESSION records. time_scale is the scale of the given times, "UTC" or "GPS", use
+    # week_seconds_to_gps first for week and seconds of week
+    def observation_times(self, start, end, time_scale = "UTC"):
+        if time_scale not in ("UTC", "GPS"):
+            raise Exception("Time scale must be either UTC or GPS")
+        start = self.parse_datetimes(start)
+        end = self.parse_datetimes(end)
+        if time_scale == "UTC":
+            leap_seconds = self.leap_seconds_at_utc(start)
+            start = self.utc_to_gps(start)
+            end = self.utc_to_gps(end)
+        else:
+            leap_seconds = self.leap_seconds_at_gps(start)
+        leap_seconds = leap_seconds.astype(str)
+        leap_seconds[np.isnat(start)] = ""
+        return self.format_datetimes(start), self.format_datetimes(end), leap_seconds
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_append.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+                2026/10/19 - The original tail is saved to a rollback file before it is rewritten
+
+Description:    This script contains a writer that adds EQUIPMENT, SURVEY_SETUP, POINT,
+                GNSS_VECTOR and SESSION records to an existing GVX file. Only the part of
+                the file after the first insertion point is rewritten, the header and the
+                records before it are left in place
+----------------------------------------------------------------------------------'''
+import os, struct
+import xml.etree.ElementTree as ET
+from ngs_xml_writer import GVX_XML_Writer, HEADER_ORDER, GVX_RECORD_ORDER
+from gvx_reader import GVX_Reader
+
+
+# This is the GVX append writer, the add_* record methods validate and build records exactly like
+# GVX_XML_Writer, write_file splices them into the existing file at the end of their sections. Before the
+# file is touched the part after the first insertion point is saved to <filepath>.append and forced to
+# disk, when the rewrite fails the file is rolled back from it, and a writer created after a crash rolls
+# the file back before it does anything else
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Append_Writer(GVX_XML_Writer):
+
+    keeps_records = False
+
+    def __init__(self, filepath, buffer_size = 1048576):
+        super().__init__(filepath)
+        self.buffer_size = buffer_size
+        self.new_records = {section: [] for section in GVX_RECORD_ORDER}
+        self.rollback_filepath = os.fspath(filepath) + ".append"
+        self.roll_back()
+
+    def append_record(self, element):
+        self.new_records[element.tag].append(ET.tostring(element))
+
+    def add_source_data(self, *args, **kwargs):
+        raise Exception("Source data record already assigned in {}".format(self.filepath))
+
+    def add_project_information(self, *args, **kwargs):
+        raise Exception("Project information record already assigned in {}".format(self.filepath))
+
+    def add_reference_system(self, *args, **kwargs):
+        raise Exception("Reference system records can not be appended to {}".format(self.filepath))
+
+    # Returns the offset where new records of each section go, the end of the last element of that
+    # section or of the closest section before it
+    def insertion_offsets(self):
+        section_ends = GVX_Reader(self.filepath).section_end_offsets()
+        if not all(section in section_ends for section in HEADER_ORDER):
+            raise Exception("{} is missing its SOURCE_DATA, PROJECT_INFORMATION or REFERENCE_SYSTEM".format(self.filepath))
+        offsets = {}
+        offset = section_ends[HEADER_ORDER[-1]]
+        for section in GVX_RECORD_ORDER:
+            offset = max(offset, section_ends.get(section, offset))
+            offsets[section] = offset
+        return offsets
+
+    def copy_bytes(self, source, destination, length):
+        while length > 0:
+            chunk = source.read(min(length, self.buffer_size))
+            if not chunk:
+                raise Exception("Unexpected end of file while rewriting {}".format(self.filepath))
+            destination.write(chunk)
+            length -= len(chunk)
+
+    # Saves the file from tail_start on, after the offset, and forces it to disk. The rollback file is
+    # renamed into place once complete so a partial one is never used
+    def save_tail(self, tail_start):
+        part_filepath = self.rollback_filepath + ".part"
+        with open(self.filepath, "rb") as gvx_file, open(part_filepath, "wb") as rollback_file:
+            rollback_file.write(struct.pack("<Q", tail_start))
+            gvx_file.seek(tail_start)
+            while True:
+                chunk = gvx_file.read(self.buffer_size)
+                if not chunk:
+                    break
+                rollback_file.write(chunk)
+            rollback_file.flush()
+            os.fsync(rollback_file.fileno())
+        os.replace(part_filepath, self.rollback_filepath)
+
+    # Restores the file from the rollback file of an append that did not finish, then removes it
+    def roll_back(self):
+        part_filepath = self.rollback_filepath + ".part"
+        if os.path.exists(part_filepath):
+            os.remove(part_filepath)
+        if not os.path.exists(self.rollback_filepath):
+            return
+        with open(self.rollback_filepath, "rb") as rollback_file, open(self.filepath, "r+b") as gvx_file:
+            tail_start, = struct.unpack("<Q", rollback_file.read(8))
+            gvx_file.seek(tail_start)
+            while True:
+                chunk = rollback_file.read(self.buffer_size)
+                if not chunk:
+                    break
+                gvx_file.write(chunk)
+            gvx_file.truncate()
+            gvx_file.flush()
+            os.fsync(gvx_file.fileno())
+        os.remove(self.rollback_filepath)
+
+    def write_file(self):
+        sections = [section for section in GVX_RECORD_ORDER if self.new_records[section]]
+        if not sections:
+            return
+        offsets = self.insertion_offsets()
+        tail_start = offsets[sections[0]]
+        self.save_tail(tail_start)
+        try:
+            with open(self.filepath, "r+b") as gvx_file, open(self.rollback_filepath, "rb") as tail:
+                # Write the saved tail back with the new records spliced in at the end of their sections
+                tail.seek(8)
+                gvx_file.seek(tail_start)
+                position = tail_start
+                for section in sections:
+                    self.copy_bytes(tail, gvx_file, offsets[section] - position)
+                    gvx_file.writelines(self.new_records[section])
+                    position = offsets[section]
+                while True:
+                    chunk = tail.read(self.buffer_size)
+                    if not chunk:
+                        break
+                    gvx_file.write(chunk)
+                gvx_file.flush()
+                os.fsync(gvx_file.fileno())
+        except BaseException:
+            self.roll_back()
+            raise
+        os.remove(self.rollback_filepath)
+        self.new_records = {section: [] for section in GVX_RECORD_ORDER}
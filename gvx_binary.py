@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_binary.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+
+Description:    This script contains a writer and a streaming reader for GVXB, a compact
+                binary encoding of the records a GVX_XML_Writer writes, and functions that
+                convert GVX files to GVXB and back without loss.
+
+                A GVXB file is the magic bytes followed by frames, each frame is a one
+                byte kind and a four byte little endian payload length. String frames add
+                the next entry of the string table, record frames hold a section number
+                and the section's fields in RECORD_FIELDS order. Every string is stored
+                once in the string table and referenced by index. Fields whose text is
+                exactly the repr of a float or the str of an int are stored as float64 or
+                int64, everything else as a string, so decoding reproduces the text of
+                every field and the XML written from it is identical to the source
+----------------------------------------------------------------------------------'''
+import os, struct
+from ngs_xml_writer import GVX_XML_Writer, GVX_Stream_Writer, HEADER_ORDER, GVX_RECORD_ORDER
+from gvx_reader import GVX_Reader, SECTION_FIELDS, SECTION_METHODS
+
+MAGIC = b"GVXB\x01"
+
+# Frame kinds
+STRING_FRAME = 1
+RECORD_FRAME = 2
+
+# Field value tags
+NONE_VALUE = 0
+FLOAT_VALUE = 1
+INT_VALUE = 2
+STRING_VALUE = 3
+LIST_VALUE = 4
+
+BINARY_SECTIONS = HEADER_ORDER + GVX_RECORD_ORDER
+
+# Field order of every section, the SESSION attributes and CCM_BLOCK list follow its SESSION_TIME fields
+RECORD_FIELDS = {section: tuple(fields) for section, fields in SECTION_FIELDS.items()}
+RECORD_FIELDS["SESSION"] += ("ID", "TOTAL_VECTORS", "ORDER", "CCM_BLOCK")
+
+FRAME = struct.Struct("<BI")
+TAG = struct.Struct("<B")
+FLOAT = struct.Struct("<Bd")
+INT = struct.Struct("<Bq")
+REFERENCE = struct.Struct("<BI")
+COUNT = struct.Struct("<I")
+DOUBLE = struct.Struct("<d")
+LONG = struct.Struct("<q")
+
+
+# This is the GVXB writer. The add_* methods validate and build records exactly like GVX_XML_Writer and
+# stream their encoded fields to the file, the header is written when the first record is added.
+# write_record writes a record that is already a dictionary of add_* keyword arguments, e.g. one read
+# by GVX_Reader, without validating it again. Records must be added in schema order
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Binary_Writer(GVX_XML_Writer):
+
+    keeps_records = False
+
+    def __init__(self, filepath, buffer_size = 1048576):
+        super().__init__(filepath)
+        self.part_filepath = os.fspath(filepath) + ".part"
+        self.buffer_size = buffer_size
+        self.stream = None
+        self.strings = {}
+        self.section_index = 0
+        self.records_written = 0
+        self.reader = GVX_Reader()
+
+    def open_stream(self):
+        self.stream = open(self.part_filepath, "wb", buffering=self.buffer_size)
+        self.stream.write(MAGIC)
+        for element in self.root:
+            if element.tag not in HEADER_ORDER:
+                break
+            self.write_frame(element.tag, self.reader.record_from_element(element))
+
+    def append_record(self, element):
+        self.write_record(element.tag, self.reader.record_from_element(element))
+
+    def write_record(self, section, record):
+        section_index = GVX_RECORD_ORDER.index(section)
+        if section_index < self.section_index:
+            raise Exception("{} record added after {} records, records must be added in schema order".format(
+                section, GVX_RECORD_ORDER[self.section_index]))
+        self.section_index = section_index
+        if self.stream is None:
+            self.open_stream()
+        self.write_frame(section, record)
+        self.records_written += 1
+
+    # Encodes a field, the strings that are not in the string table yet are added to new_strings
+    def encode_value(self, value, payload, new_strings):
+        if value is None:
+            payload += TAG.pack(NONE_VALUE)
+            return
+        if isinstance(value, list):
+            payload += REFERENCE.pack(LIST_VALUE, len(value))
+            for block in value:
+                self.encode_value(block["vec_id_row"], payload, new_strings)
+                self.encode_value(block["vec_id_col"], payload, new_strings)
+                payload += COUNT.pack(len(block["correlations"]))
+                for correlation in block["correlations"]:
+                    self.encode_value(correlation, payload, new_strings)
+            return
+        text = value if isinstance(value, str) else str(value)
+        try:
+            number = float(text)
+            if repr(number) == text:
+                payload += FLOAT.pack(FLOAT_VALUE, number)
+                return
+            number = int(text)
+            if str(number) == text and -9223372036854775808 <= number <= 9223372036854775807:
+                payload += INT.pack(INT_VALUE, number)
+                return
+        except ValueError:
+            pass
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+            new_strings.append(text)
+        payload += REFERENCE.pack(STRING_VALUE, index)
+
+    def write_frame(self, section, record):
+        payload = bytearray(TAG.pack(BINARY_SECTIONS.index(section)))
+        new_strings = []
+        for name in RECORD_FIELDS[section]:
+            self.encode_value(record.get(name), payload, new_strings)
+        for text in new_strings:
+            encoded = text.encode("utf-8")
+            self.stream.write(FRAME.pack(STRING_FRAME, len(encoded)))
+            self.stream.write(encoded)
+        self.stream.write(FRAME.pack(RECORD_FRAME, len(payload)))
+        self.stream.write(payload)
+
+    def write_file(self):
+        if self.stream is None:
+            self.open_stream()
+        self.stream.flush()
+        os.fsync(self.stream.fileno())
+        self.stream.close()
+        os.replace(self.part_filepath, self.filepath)
+
+
+# This is the GVXB reader, records are decoded one frame at a time into the same dictionaries of add_*
+# keyword arguments GVX_Reader returns
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Binary_Reader():
+
+    def __init__(self, filepath, buffer_size = 1048576):
+        self.filepath = filepath
+        self.buffer_size = buffer_size
+
+    def decode_value(self, payload, offset, strings):
+        tag = payload[offset]
+        offset += 1
+        if tag == NONE_VALUE:
+            return None, offset
+        if tag == FLOAT_VALUE:
+            return repr(DOUBLE.unpack_from(payload, offset)[0]), offset + 8
+        if tag == INT_VALUE:
+            return str(LONG.unpack_from(payload, offset)[0]), offset + 8
+        if tag == STRING_VALUE:
+            return strings[COUNT.unpack_from(payload, offset)[0]], offset + 4
+        if tag == LIST_VALUE:
+            blocks = []
+            block_count = COUNT.unpack_from(payload, offset)[0]
+            offset += 4
+            for i in range(block_count):
+                vec_id_row, offset = self.decode_value(payload, offset, strings)
+                vec_id_col, offset = self.decode_value(payload, offset, strings)
+                correlation_count = COUNT.unpack_from(payload, offset)[0]
+                offset += 4
+                correlations = []
+                for j in range(correlation_count):
+                    correlation, offset = self.decode_value(payload, offset, strings)
+                    correlations.append(correlation)
+                blocks.append({"vec_id_row": vec_id_row, "vec_id_col": vec_id_col, "correlations": correlations})
+            return blocks, offset
+        raise Exception("Unknown GVXB value tag {} in {}".format(tag, self.filepath))
+
+    # Yields (section, record) in file order, optionally limited to the given sections
+    def iter_records(self, sections = None):
+        strings = []
+        with open(self.filepath, "rb", buffering=self.buffer_size) as binary_file:
+            if binary_file.read(len(MAGIC)) != MAGIC:
+                raise Exception("{} is not a GVXB file".format(self.filepath))
+            while True:
+                frame = binary_file.read(FRAME.size)
+                if not frame:
+                    break
+                if len(frame) < FRAME.size:
+                    raise Exception("{} is truncated".format(self.filepath))
+                kind, length = FRAME.unpack(frame)
+                payload = binary_file.read(length)
+                if len(payload) < length:
+                    raise Exception("{} is truncated".format(self.filepath))
+                if kind == STRING_FRAME:
+                    strings.append(payload.decode("utf-8"))
+                    continue
+                if kind != RECORD_FRAME:
+                    raise Exception("Unknown GVXB frame kind {} in {}".format(kind, self.filepath))
+                section = BINARY_SECTIONS[payload[0]]
+                if sections is not None and section not in sections:
+                    continue
+                record = {}
+                offset = 1
+                for name in RECORD_FIELDS[section]:
+                    record[name], offset = self.decode_value(payload, offset, strings)
+                yield section, record
+
+
+# Converts a GVX file to GVXB, the records are streamed from the XML so memory use does not depend on the
+# size of the file
+def gvx_to_binary(gvx_filepath, binary_filepath):
+    writer = GVX_Binary_Writer(binary_filepath)
+    for section, record in GVX_Reader(gvx_filepath).iter_records():
+        if section in HEADER_ORDER:
+            getattr(writer, SECTION_METHODS[section])(**record)
+        else:
+            writer.write_record(section, record)
+    writer.write_file()
+    return writer.records_written
+
+
+# Converts a GVXB file to a GVX file, every record is validated by the GVX_XML_Writer add_* methods again
+def binary_to_gvx(binary_filepath, gvx_filepath):
+    writer = GVX_Stream_Writer(gvx_filepath)
+    for section, record in GVX_Binary_Reader(binary_filepath).iter_records():
+        getattr(writer, SECTION_METHODS[section])(**record)
+    writer.write_file()
+    return writer.records_written
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_cache.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+                2026/10/19 - fill_leap_seconds calls are hashed
+                2026/10/19 - Falsy optional arguments are hashed as None, like the writer leaves them out
+                2026/10/19 - Records and the header are hashed as the bytes they are serialized to
+
+Description:    This script contains a GVX writer that keeps a content addressed cache of
+                the files it writes. Every record is hashed as it is added and write_file
+                takes the file from the cache when an earlier run produced the same hash
+----------------------------------------------------------------------------------'''
+import os, sys, shutil, hashlib
+import xml.etree.ElementTree as ET
+from ngs_xml_writer import GVX_XML_Writer
+
+# Changing how records are serialized must change this so older cache entries are no longer used. The
+# Python version is hashed as well, ElementTree sorts attributes before 3.8 and keeps their order after
+CACHE_VERSION = "GVX cache 3"
+
+
+# This is the cached GVX writer. Every record is hashed as the bytes it is serialized to when it is appended,
+# the fill_* methods that change records afterwards are hashed by name together with the serialized header
+# they read and the header is hashed as serialized when the file is written, so two writers get the same
+# hash only when they would write the same file. write_file serializes the document into the cache
+# directory under that hash only if no entry exists yet, then copies the entry to the filepath, or hard
+# links it with link=True. Linked outputs share their bytes with the cache and must not be modified in
+# place, e.g. by GVX_Append_Writer. Cache entries are touched when they are used and the least recently
+# used entries are removed once the cache is larger than cache_size bytes. Pre write hooks still run on a
+# cache hit, they must not modify the document
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Cached_Writer(GVX_XML_Writer):
+
+    def __init__(self, filepath, cache_directory, cache_size = 1073741824, link = False):
+        super().__init__(filepath)
+        self.cache_directory = cache_directory
+        self.cache_size = cache_size
+        self.link = link
+        self.content_hash = hashlib.sha256()
+        self.content_hash.update("{}\0{}.{}\0".format(CACHE_VERSION, *sys.version_info[:2]).encode("utf-8"))
+        self.cache_hit = None
+
+    # Every hashed item is prefixed with its kind and length so different sequences never give the same bytes
+    def hash_bytes(self, kind, data):
+        self.content_hash.update(kind + len(data).to_bytes(8, "little"))
+        self.content_hash.update(data)
+
+    def append_record(self, element):
+        super().append_record(element)
+        self.hash_bytes(b"R", ET.tostring(element))
+
+    def fill_point_coordinates(self):
+        super().fill_point_coordinates()
+        self.hash_bytes(b"F", b"fill_point_coordinates" + self.header_bytes())
+
+    def fill_point_correlation_matrices(self):
+        super().fill_point_correlation_matrices()
+        self.hash_bytes(b"F", b"fill_point_correlation_matrices" + self.header_bytes())
+
+    def fill_leap_seconds(self):
+        super().fill_leap_seconds()
+        self.hash_bytes(b"F", b"fill_leap_seconds" + self.header_bytes())
+
+    def content_digest(self):
+        content_hash = self.content_hash.copy()
+        content_hash.update(b"H" + self.header_bytes())
+        return content_hash.hexdigest()
+
+    def cache_filepath(self):
+        return os.path.join(self.cache_directory, self.content_digest() + ".gvx")
+
+    def write_file(self):
+        self.run_pre_write_hooks()
+        self.check_point_coordinates()
+        cache_filepath = self.cache_filepath()
+        self.cache_hit = os.path.exists(cache_filepath)
+        if self.cache_hit:
+            os.utime(cache_filepath)
+        else:
+            os.makedirs(self.cache_directory, exist_ok=True)
+            cache_part_filepath = "{}.{}.part".format(cache_filepath, os.getpid())
+            with open(cache_part_filepath, "wb") as gvxFile:
+                ET.ElementTree(self.root).write(gvxFile)
+            os.replace(cache_part_filepath, cache_filepath)
+
+        part_filepath = os.fspath(self.filepath) + ".part"
+        if os.path.exists(part_filepath):
+            os.remove(part_filepath)
+        if self.link:
+            try:
+                os.link(cache_filepath, part_filepath)
+            except OSError:
+                shutil.copyfile(cache_filepath, part_filepath)
+        else:
+            shutil.copyfile(cache_filepath, part_filepath)
+        os.replace(part_filepath, self.filepath)
+        self.evict(keep=cache_filepath)
+
+    # Removes the least recently used cache entries until the cache fits in cache_size, the entry just
+    # written or used is kept even if it is larger than the cache
+    def evict(self, keep = None):
+        entries = []
+        total_size = 0
+        with os.scandir(self.cache_directory) as scan:
+            for entry in scan:
+                if entry.is_file() and entry.name.endswith(".gvx"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+                    total_size += stat.st_size
+        entries.sort()
+        for mtime, path, size in entries:
+            if total_size <= self.cache_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
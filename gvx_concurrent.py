@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_concurrent.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+                2026/10/19 - Serialized records are spooled to temporary files instead of kept in memory
+                2026/10/19 - Records added after write_file are refused
+
+Description:    This script contains a GVX writer that can be shared by many producer
+                threads. Records are validated and built in the calling threads, handed
+                to a single serializer thread through a bounded queue and written in
+                schema order by write_file
+----------------------------------------------------------------------------------'''
+import os, heapq, queue, struct, tempfile, threading
+import xml.etree.ElementTree as ET
+from ngs_xml_writer import GVX_XML_Writer, GVX_Spool_Writer, GVX_RECORD_ORDER
+
+
+# Builds and validates single records with the GVX_XML_Writer add_* methods, the finished record is kept
+# on the builder instead of being attached to a document
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Record_Builder(GVX_XML_Writer):
+
+    def __init__(self):
+        super().__init__(None)
+        self.record = None
+
+    def append_record(self, element):
+        self.record = element
+
+
+# Sort key that orders numeric IDs by value and puts them before other IDs, which are ordered as strings
+def id_sort_key(ID):
+    if ID.isdigit():
+        return (0, int(ID), ID)
+    return (1, 0, ID)
+
+
+# This is the concurrent GVX writer. The header methods are serialized with a lock, the record methods
+# can be called from any number of threads. A full queue blocks the producers until the serializer
+# thread catches up, and serialized records go to temporary files next to the filepath, or in
+# spool_directory, so memory use stays bounded however large the document is. With order "insertion"
+# the records of each section are written in the order they were queued, which is deterministic for a
+# single producer per section, and each section is spooled like GVX_Spool_Writer does. With order "id"
+# the records of each section are written sorted by ID, every run_size records of a section are sorted
+# and spilled to a run file and write_file merges the runs
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Concurrent_Writer():
+
+    def __init__(self, filepath, queue_size = 10000, order = "id", spool_directory = None, run_size = 100000, buffer_size = 1048576):
+        if order not in ("id", "insertion"):
+            raise Exception("Record order must be either id or insertion")
+        self.filepath = filepath
+        self.order = order
+        self.run_size = run_size
+        self.buffer_size = buffer_size
+        self.writer = GVX_Spool_Writer(filepath, spool_directory, buffer_size)
+        self.header_lock = threading.Lock()
+        self.builders = threading.local()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.sections = {section: [] for section in GVX_RECORD_ORDER}
+        self.runs = {section: [] for section in GVX_RECORD_ORDER}
+        self.serializer_error = None
+        self.closed = False
+        self.serializer = threading.Thread(target=self.serialize, name="gvx-serializer", daemon=True)
+        self.serializer.start()
+
+    def add_source_data(self, *args, **kwargs):
+        with self.header_lock:
+            self.writer.add_source_data(*args, **kwargs)
+
+    def add_project_information(self, *args, **kwargs):
+        with self.header_lock:
+            self.writer.add_project_information(*args, **kwargs)
+
+    def add_reference_system(self, *args, **kwargs):
+        with self.header_lock:
+            self.writer.add_reference_system(*args, **kwargs)
+
+    def add_pre_write_hook(self, hook):
+        raise Exception("GVX_Concurrent_Writer serializes records as they are added, pre write hooks can not run on it")
+
+    def add_equipment(self, *args, **kwargs):
+        self.submit("add_equipment", args, kwargs)
+
+    def add_survey_setup(self, *args, **kwargs):
+        self.submit("add_survey_setup", args, kwargs)
+
+    def add_point(self, *args, **kwargs):
+        self.submit("add_point", args, kwargs)
+
+    def add_gnss_vector(self, *args, **kwargs):
+        self.submit("add_gnss_vector", args, kwargs)
+
+    def add_session(self, *args, **kwargs):
+        self.submit("add_session", args, kwargs)
+
+    # Validates and builds the record in the calling thread, then queues it for the serializer thread
+    def submit(self, method_name, args, kwargs):
+        if self.closed:
+            raise Exception("{} has already been written, records can not be added after write_file".format(self.filepath))
+        if self.serializer_error is not None:
+            raise self.serializer_error
+        builder = getattr(self.builders, "builder", None)
+        if builder is None:
+            builder = self.builders.builder = GVX_Record_Builder()
+        getattr(builder, method_name)(*args, **kwargs)
+        self.queue.put(builder.record)
+        builder.record = None
+
+    def serialize(self):
+        while True:
+            element = self.queue.get()
+            if element is None:
+                break
+            try:
+                if self.order == "insertion":
+                    self.writer.append_record(element)
+                    continue
+                ID = element.get("ID") if element.tag == "SESSION" else element.findtext("ID")
+                records = self.sections[element.tag]
+                records.append((id_sort_key(ID), ID, ET.tostring(element)))
+                if len(records) >= self.run_size:
+                    self.spill_run(element.tag)
+            except Exception as ex:
+                self.serializer_error = ex
+
+    # Sorts the records of a section held in memory and writes them to a new run file as length prefixed
+    # ID and record pairs. The sort is stable so records with the same ID keep their queue order
+    def spill_run(self, section):
+        records = self.sections[section]
+        records.sort(key=lambda record: record[0])
+        run = tempfile.TemporaryFile(dir=self.writer.spool_directory, buffering=self.buffer_size)
+        for key, ID, record in records:
+            ID = ID.encode("utf-8")
+            run.write(struct.pack("<II", len(ID), len(record)))
+            run.write(ID)
+            run.write(record)
+        self.runs[section].append(run)
+        self.sections[section] = []
+
+    def read_run(self, run):
+        run.flush()
+        run.seek(0)
+        while True:
+            lengths = run.read(8)
+            if not lengths:
+                break
+            ID_length, record_length = struct.unpack("<II", lengths)
+            ID = run.read(ID_length).decode("utf-8")
+            yield id_sort_key(ID), ID, run.read(record_length)
+
+    # The records of a section sorted by ID, the run files are merged in the order they were spilled and
+    # the records still in memory come last, which keeps records with the same ID in queue order
+    def sorted_records(self, section):
+        records = self.sections[section]
+        records.sort(key=lambda record: record[0])
+        runs = [self.read_run(run) for run in self.runs[section]]
+        for key, ID, record in heapq.merge(*runs, records, key=lambda record: record[0]):
+            yield record
+
+    # Stops the serializer thread once it has drained the queue and writes the file in schema order. Producers
+    # must be done before it is called, later records are refused
+    def write_file(self):
+        if self.closed:
+            raise Exception("{} has already been written".format(self.filepath))
+        self.closed = True
+        self.queue.put(None)
+        self.serializer.join()
+        if self.serializer_error is not None:
+            raise self.serializer_error
+        if self.order == "insertion":
+            self.writer.write_file()
+            return
+        part_filepath = os.fspath(self.filepath) + ".part"
+        try:
+            with open(part_filepath, "wb", buffering=self.buffer_size) as gvx_file:
+                gvx_file.write(self.writer.header_bytes())
+                for section in GVX_RECORD_ORDER:
+                    gvx_file.writelines(self.sorted_records(section))
+                gvx_file.write(self.writer.footer_bytes())
+            os.replace(part_filepath, self.filepath)
+        finally:
+            for runs in self.runs.values():
+                for run in runs:
+                    run.close()
+            self.runs = {section: [] for section in GVX_RECORD_ORDER}
+            self.sections = {section: [] for section in GVX_RECORD_ORDER}
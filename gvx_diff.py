@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_diff.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+
+Description:    This script contains a class to compare two GVX files record by record.
+                Both files are streamed and reduced to a compact digest per record ID,
+                only the records whose digests differ are read again for field level
+                detail, so memory use depends on the number of IDs, not the file sizes
+----------------------------------------------------------------------------------'''
+import hashlib
+from ngs_xml_writer import GVX_RECORD_ORDER
+from gvx_reader import GVX_Reader
+from validation_lookup_and_reformatting import String_Checker
+
+
+class GVX_Diff():
+
+    # With a tolerance, numeric fields that differ by no more than the tolerance are treated as equal
+    def __init__(self, old_filepath, new_filepath, tolerance = None, sections = GVX_RECORD_ORDER):
+        self.old_filepath = old_filepath
+        self.new_filepath = new_filepath
+        self.tolerance = tolerance
+        self.sections = tuple(sections)
+        self.string_checker = String_Checker()
+
+    def record_id(self, record):
+        return str(record["ID"])
+
+    # 16 byte digest of every field of a record, the reader always returns the fields in the same order
+    def record_digest(self, record):
+        return hashlib.blake2b(repr(list(record.values())).encode("utf-8"), digest_size=16).digest()
+
+    def file_digests(self, filepath):
+        digests = {section: {} for section in self.sections}
+        for section, record in GVX_Reader(filepath).iter_records(self.sections):
+            digests[section][self.record_id(record)] = self.record_digest(record)
+        return digests
+
+    # Reads the full records of the given IDs of every section
+    def read_records(self, filepath, ids):
+        records = {section: {} for section in self.sections}
+        for section, record in GVX_Reader(filepath).iter_records(self.sections):
+            ID = self.record_id(record)
+            if ID in ids[section]:
+                records[section][ID] = record
+        return records
+
+    def values_equal(self, old_value, new_value):
+        if old_value == new_value:
+            return True
+        if self.tolerance is None:
+            return False
+        if isinstance(old_value, list) and isinstance(new_value, list):
+            return len(old_value) == len(new_value) and all(self.values_equal(old, new) for old, new in zip(old_value, new_value))
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            return old_value.keys() == new_value.keys() and all(self.values_equal(old_value[key], new_value[key]) for key in old_value)
+        if old_value is not None and new_value is not None and self.string_checker.is_float(old_value) and self.string_checker.is_float(new_value):
+            return abs(float(old_value) - float(new_value)) <= self.tolerance
+        return False
+
+    # Returns {section: {"added": [IDs], "removed": [IDs], "modified": {ID: {field: (old value, new value)}}}}
+    def compare(self):
+        old_digests = self.file_digests(self.old_filepath)
+        new_digests = self.file_digests(self.new_filepath)
+        differences = {}
+        changed = {}
+        for section in self.sections:
+            old_section = old_digests[section]
+            new_section = new_digests[section]
+            differences[section] = {
+                "added": [ID for ID in new_section if ID not in old_section],
+                "removed": [ID for ID in old_section if ID not in new_section],
+                "modified": {},
+            }
+            changed[section] = set(ID for ID, digest in new_section.items() if ID in old_section and old_section[ID] != digest)
+        del old_digests, new_digests
+
+        if any(changed.values()):
+            old_records = self.read_records(self.old_filepath, changed)
+            new_records = self.read_records(self.new_filepath, changed)
+            for section in self.sections:
+                for ID in sorted(changed[section]):
+                    old_record = old_records[section][ID]
+                    new_record = new_records[section][ID]
+                    fields = {name: (old_record[name], new_record[name]) for name in old_record
+                        if not self.values_equal(old_record[name], new_record[name])}
+                    if fields:
+                        differences[section]["modified"][ID] = fields
+        return differences
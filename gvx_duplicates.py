@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_duplicates.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+                2026/10/19 - Sources given as path-like objects are read as files
+                2026/10/19 - Vectors between two merged points are dropped instead of written as self loops
+
+Description:    This script contains a class that finds POINT records of a GVX_XML_Writer or
+                a GVX file that lie within a distance of each other, e.g. the same mark sent
+                in under two IDs, and merges them into one point. Points are hashed into a
+                grid of cells as large as the distance so only points in neighbouring cells
+                are compared
+----------------------------------------------------------------------------------'''
+import numpy as np
+from ngs_xml_writer import GVX_Stream_Writer
+from gvx_reader import GVX_Reader, SECTION_METHODS
+from gvx_qc import iter_source_records, is_filepath, geocentric_coordinates
+
+CELL = np.dtype([("x", np.int64), ("y", np.int64), ("z", np.int64)])
+
+# The 13 neighbouring cells that come after a cell, together with the cell itself every pair of neighbouring
+# cells is visited once
+FORWARD_OFFSETS = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1) if (dx, dy, dz) > (0, 0, 0)]
+
+
+# Every pair (i, j) with i in the range start_a, start_a + count_a and j in start_b, start_b + count_b, for
+# arrays of ranges
+def expand_pairs(start_a, count_a, start_b, count_b):
+    sizes = count_a * count_b
+    pair = np.repeat(np.arange(len(sizes)), sizes)
+    k = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return start_a[pair] + k // count_b[pair], start_b[pair] + k % count_b[pair]
+
+
+# This is the duplicate point checker. Points are compared by their GEOCENTRIC_COORDINATES, points that only
+# have GEODETIC_COORDINATES are converted on the ellipsoid of their REFERENCE_SYSTEM_ID and points without
+# coordinates are skipped. Points closer than tolerance meters are grouped, transitively, and the first
+# point of each group in document order is the one that is kept when duplicates are merged
+#---------------------------------------------------------------------------------------------------------------
+class Duplicate_Point_Checker():
+
+    def __init__(self, source, tolerance = 0.01):
+        if tolerance <= 0:
+            raise Exception("Tolerance must be greater than 0")
+        self.source = source
+        self.tolerance = float(tolerance)
+        self.dropped_vectors = []
+        self.read_points()
+        self.find_duplicates()
+
+    def read_points(self):
+        ids, names, values, reference_systems = [], [], [], []
+        for section, record in iter_source_records(self.source, "POINT"):
+            ids.append(record["ID"])
+            names.append(record["NAME"])
+            values.append([record[name] or "nan" for name in ("X", "Y", "Z", "LATITUDE", "LONGITUDE", "ELLIPSOIDAL_HEIGHT")])
+            reference_systems.append(record["REFERENCE_SYSTEM_ID"])
+        values = np.array(values, dtype=np.float64).reshape(-1, 6)
+        self.ids = np.array(ids, dtype=object)
+        self.names = np.array(names, dtype=object)
+        self.coordinates = geocentric_coordinates(values, reference_systems)
+
+    def find_duplicates(self):
+        located = np.flatnonzero(~np.isnan(self.coordinates).any(axis=1))
+        cells = np.floor(self.coordinates[located] / self.tolerance).astype(np.int64)
+        order = np.lexsort((cells[:, 2], cells[:, 1], cells[:, 0]))
+        points = located[order]
+        cells = cells[order]
+
+        # Runs of points in the same cell
+        changed = np.ones(len(cells), dtype=bool)
+        changed[1:] = (cells[1:] != cells[:-1]).any(axis=1)
+        starts = np.flatnonzero(changed)
+        counts = np.diff(np.append(starts, len(cells)))
+        unique_cells = cells[starts]
+
+        first, second = expand_pairs(starts, counts, starts, counts)
+        keep = first < second
+        candidates_a, candidates_b = [first[keep]], [second[keep]]
+        cell_keys = self.cell_key_function(unique_cells)
+        keys = cell_keys((0, 0, 0))
+        for offset in FORWARD_OFFSETS:
+            neighbours = cell_keys(offset)
+            index = np.minimum(np.searchsorted(keys, neighbours), max(len(keys) - 1, 0))
+            found = np.flatnonzero(keys[index] == neighbours) if len(keys) else np.zeros(0, dtype=np.int64)
+            first, second = expand_pairs(starts[found], counts[found], starts[index[found]], counts[index[found]])
+            candidates_a.append(first)
+            candidates_b.append(second)
+
+        a = points[np.concatenate(candidates_a)]
+        b = points[np.concatenate(candidates_b)]
+        distances = np.linalg.norm(self.coordinates[a] - self.coordinates[b], axis=1)
+        close = distances <= self.tolerance
+        a, b, distances = np.minimum(a[close], b[close]), np.maximum(a[close], b[close]), distances[close]
+        order = np.lexsort((b, a))
+        self.pairs = np.column_stack([a[order], b[order]])
+        self.distances = distances[order]
+        self.group_duplicates()
+
+    # Returns a function that gives the sort keys of the cells next to the sorted unique cells at an offset.
+    # The keys are int64 built from the rank of every cell coordinate among the coordinates of all cells and
+    # their neighbours, which keeps the order of the cells. When the ranks do not fit in an int64 the
+    # structured CELL array is used, which compares the same way but searches more slowly
+    def cell_key_function(self, unique_cells):
+        levels = []
+        for axis in range(3):
+            level = np.sort(np.concatenate([unique_cells[:, axis] - 1, unique_cells[:, axis], unique_cells[:, axis] + 1]))
+            levels.append(level[np.append(True, level[1:] != level[:-1])])
+        sizes = [len(level) for level in levels]
+        if sizes[0] * sizes[1] * sizes[2] < 2 ** 62:
+            ranks = [{step: np.searchsorted(levels[axis], unique_cells[:, axis] + step) for step in (-1, 0, 1)} for axis in range(3)]
+            def cell_keys(offset):
+                return (ranks[0][offset[0]] * sizes[1] + ranks[1][offset[1]]) * sizes[2] + ranks[2][offset[2]]
+        else:
+            def cell_keys(offset):
+                keys = np.zeros(len(unique_cells), dtype=CELL)
+                for axis, field in enumerate(CELL.names):
+                    keys[field] = unique_cells[:, axis] + offset[axis]
+                return keys
+        return cell_keys
+
+    # Groups the pairs into connected sets of points, each group is kept by its first point
+    def group_duplicates(self):
+        parents = {}
+        def root(point):
+            while parents.get(point, point) != point:
+                parents[point] = parents.get(parents[point], parents[point])
+                point = parents[point]
+            return point
+        for a, b in self.pairs.tolist():
+            root_a, root_b = root(a), root(b)
+            if root_a != root_b:
+                parents[max(root_a, root_b)] = min(root_a, root_b)
+        groups = {}
+        for point in sorted(parents):
+            groups.setdefault(root(point), [root(point)]).append(point)
+        self.groups = [groups[key] for key in sorted(groups)]
+        self.duplicates = {point: group[0] for group in self.groups for point in group[1:]}
+
+    def report(self):
+        return [{
+            "keep_id": self.ids[group[0]],
+            "keep_name": self.names[group[0]],
+            "duplicate_ids": [self.ids[point] for point in group[1:]],
+            "duplicate_names": [self.names[point] for point in group[1:]],
+            "max_distance": float(np.linalg.norm(self.coordinates[group] - self.coordinates[group[0]], axis=1).max()),
+            } for group in self.groups]
+
+    # Point ID of every merged point mapped to the ID of the point that replaces it
+    def id_replacements(self):
+        return {self.ids[point]: self.ids[keep] for point, keep in self.duplicates.items() if self.ids[point] != self.ids[keep]}
+
+    # Removes the duplicate POINT records from the writer and points the GNSS_VECTOR records that referenced
+    # them at the kept points, returns the ID replacements. A vector between two points of the same group would
+    # start and end at the kept point, it is removed and its ID is listed in dropped_vectors. SESSION records
+    # that reference it are left as they are
+    def merge(self):
+        if is_filepath(self.source):
+            raise Exception("The points were read from a file, use merge_file to write a merged copy")
+        replacements = self.id_replacements()
+        points = self.source.root.findall("POINT")
+        removed = set(id(points[point]) for point in self.duplicates)
+        self.dropped_vectors = []
+        for vector in self.source.root.iter("GNSS_VECTOR"):
+            initial, terminal = vector.find("INITIAL_POINT_ID"), vector.find("TERMINAL_POINT_ID")
+            initial_id = replacements.get(initial.text, initial.text)
+            terminal_id = replacements.get(terminal.text, terminal.text)
+            if initial_id == terminal_id and initial.text != terminal.text:
+                removed.add(id(vector))
+                self.dropped_vectors.append(vector.findtext("ID"))
+            initial.text, terminal.text = initial_id, terminal_id
+        self.source.root[:] = [element for element in self.source.root if id(element) not in removed]
+        self.read_points()
+        self.find_duplicates()
+        return replacements
+
+    # Writes a copy of the GVX file the points were read from without the duplicate POINT records and with
+    # the GNSS_VECTOR records pointed at the kept points, the file is streamed. Returns the ID replacements,
+    # vectors between two points of the same group are dropped as in merge
+    def merge_file(self, output_filepath):
+        if not is_filepath(self.source):
+            raise Exception("The points were read from a writer, use merge to merge them in place")
+        replacements = self.id_replacements()
+        self.dropped_vectors = []
+        writer = GVX_Stream_Writer(output_filepath)
+        point = 0
+        for section, record in GVX_Reader(self.source).iter_records():
+            if section == "POINT":
+                point += 1
+                if point - 1 in self.duplicates:
+                    continue
+            elif section == "GNSS_VECTOR":
+                initial_id = replacements.get(record["INITIAL_POINT_ID"], record["INITIAL_POINT_ID"])
+                terminal_id = replacements.get(record["TERMINAL_POINT_ID"], record["TERMINAL_POINT_ID"])
+                if initial_id == terminal_id and record["INITIAL_POINT_ID"] != record["TERMINAL_POINT_ID"]:
+                    self.dropped_vectors.append(record["ID"])
+                    continue
+                record["INITIAL_POINT_ID"], record["TERMINAL_POINT_ID"] = initial_id, terminal_id
+            getattr(writer, SECTION_METHODS[section])(**record)
+        writer.write_file()
+        return replacements
+
+
+# Returns a GVX_XML_Writer pre write hook that looks for duplicate points among the records held by the writer.
+# By default it raises an exception naming them, with merge=True it merges them instead, add it with
+# writer.add_pre_write_hook
+def duplicate_points_hook(tolerance = 0.01, merge = False):
+    def check(writer):
+        checker = Duplicate_Point_Checker(writer, tolerance)
+        if not checker.groups:
+            return
+        if merge:
+            checker.merge()
+            return
+        report = checker.report()
+        raise Exception("{} points have duplicates within {} m: {}".format(len(report), tolerance,
+            ", ".join("{} ({})".format(group["keep_id"], ", ".join(str(ID) for ID in group["duplicate_ids"])) for group in report[:20])))
+    return check
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_index.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+
+Description:    This script contains a class that keeps a SQLite index of an archive of
+                GVX files. Every file is scanned once, the byte offset and key fields of
+                its POINT, GNSS_VECTOR and SESSION records are stored so queries read only
+                the matching records. Files are only indexed again when their modification
+                time or size changed and their contents hash differs
+----------------------------------------------------------------------------------'''
+import os, hashlib, mmap, sqlite3
+import xml.etree.ElementTree as ET
+from gvx_reader import GVX_Reader
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS points (
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    id TEXT, name TEXT,
+    latitude REAL, longitude REAL, ellipsoidal_height REAL,
+    x REAL, y REAL, z REAL,
+    offset INTEGER NOT NULL, length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vectors (
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    id TEXT, initial_point_id TEXT, terminal_point_id TEXT,
+    start TEXT, end TEXT,
+    offset INTEGER NOT NULL, length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    id TEXT, start TEXT, end TEXT,
+    offset INTEGER NOT NULL, length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS points_id ON points (id);
+CREATE INDEX IF NOT EXISTS points_name ON points (name);
+CREATE INDEX IF NOT EXISTS points_file ON points (file_id);
+CREATE INDEX IF NOT EXISTS vectors_initial ON vectors (initial_point_id);
+CREATE INDEX IF NOT EXISTS vectors_terminal ON vectors (terminal_point_id);
+CREATE INDEX IF NOT EXISTS vectors_start ON vectors (start);
+CREATE INDEX IF NOT EXISTS vectors_file ON vectors (file_id);
+CREATE INDEX IF NOT EXISTS sessions_id ON sessions (id);
+CREATE INDEX IF NOT EXISTS sessions_file ON sessions (file_id);
+"""
+
+
+def to_float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+class GVX_Archive_Index():
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(INDEX_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def file_hash(self, filepath):
+        sha256 = hashlib.sha256()
+        if os.path.getsize(filepath):
+            with open(filepath, "rb") as gvx_file:
+                with mmap.mmap(gvx_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    sha256.update(data)
+        return sha256.hexdigest()
+
+    # Indexes a file unless it is already indexed and unchanged, returns True when the file was (re)indexed
+    def index_file(self, filepath):
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        row = self.connection.execute("SELECT file_id, mtime, size, sha256 FROM files WHERE path = ?", (filepath,)).fetchone()
+        if row is not None and row[1] == stat.st_mtime and row[2] == stat.st_size:
+            return False
+        sha256 = self.file_hash(filepath)
+        with self.connection:
+            if row is not None:
+                if row[3] == sha256:
+                    self.connection.execute("UPDATE files SET mtime = ?, size = ? WHERE file_id = ?", (stat.st_mtime, stat.st_size, row[0]))
+                    return False
+                self.connection.execute("DELETE FROM files WHERE file_id = ?", (row[0],))
+            file_id = self.connection.execute("INSERT INTO files (path, mtime, size, sha256) VALUES (?, ?, ?, ?)",
+                (filepath, stat.st_mtime, stat.st_size, sha256)).lastrowid
+            self.index_records(file_id, filepath)
+        return True
+
+    def index_records(self, file_id, filepath):
+        points, vectors, sessions = [], [], []
+        reader = GVX_Reader(filepath)
+        with open(filepath, "rb") as gvx_file:
+            for section, offset, length in reader.iter_record_offsets():
+                if section not in ("POINT", "GNSS_VECTOR", "SESSION"):
+                    continue
+                gvx_file.seek(offset)
+                record = reader.record_from_element(ET.fromstring(gvx_file.read(length)))
+                if section == "POINT":
+                    points.append((file_id, record["ID"], record["NAME"],
+                        to_float(record["LATITUDE"]), to_float(record["LONGITUDE"]), to_float(record["ELLIPSOIDAL_HEIGHT"]),
+                        to_float(record["X"]), to_float(record["Y"]), to_float(record["Z"]), offset, length))
+                elif section == "GNSS_VECTOR":
+                    vectors.append((file_id, record["ID"], record["INITIAL_POINT_ID"], record["TERMINAL_POINT_ID"],
+                        record["START"], record["END"], offset, length))
+                else:
+                    sessions.append((file_id, record["ID"], record["START"], record["END"], offset, length))
+        self.connection.executemany("INSERT INTO points VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", points)
+        self.connection.executemany("INSERT INTO vectors VALUES (?, ?, ?, ?, ?, ?, ?, ?)", vectors)
+        self.connection.executemany("INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?)", sessions)
+
+    # Indexes every .gvx file under a directory and drops the files that no longer exist from the index,
+    # returns the number of files that were (re)indexed
+    def index_directory(self, directory, extension = ".gvx"):
+        indexed = 0
+        found = set()
+        for dirpath, dirnames, filenames in os.walk(directory):
+            for filename in filenames:
+                if filename.lower().endswith(extension):
+                    filepath = os.path.abspath(os.path.join(dirpath, filename))
+                    found.add(filepath)
+                    if self.index_file(filepath):
+                        indexed += 1
+        prefix = os.path.join(os.path.abspath(directory), "")
+        with self.connection:
+            for file_id, path in self.connection.execute("SELECT file_id, path FROM files").fetchall():
+                if path.startswith(prefix) and path not in found:
+                    self.connection.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+        return indexed
+
+    # Queries
+    #------------------------------------------------------------------------------------------------------------
+    def files_with_point(self, point_id = None, name = None):
+        if point_id is not None:
+            rows = self.connection.execute("SELECT DISTINCT f.path FROM points p JOIN files f USING (file_id) WHERE p.id = ? ORDER BY f.path", (point_id,))
+        else:
+            rows = self.connection.execute("SELECT DISTINCT f.path FROM points p JOIN files f USING (file_id) WHERE p.name = ? ORDER BY f.path", (name,))
+        return [row[0] for row in rows]
+
+    # Returns (path, section, offset, length) of the POINT records with the given ID
+    def find_points(self, point_id):
+        return self.connection.execute(
+            "SELECT f.path, 'POINT', p.offset, p.length FROM points p JOIN files f USING (file_id) WHERE p.id = ? ORDER BY f.path, p.offset",
+            (point_id,)).fetchall()
+
+    # Returns (path, section, offset, length) of the GNSS_VECTOR records observed entirely between two dateTimes,
+    # the schema's YYYY-MM-DDThh:mm:ss.ss format sorts as text
+    def find_vectors_between(self, start, end):
+        return self.connection.execute(
+            "SELECT f.path, 'GNSS_VECTOR', v.offset, v.length FROM vectors v JOIN files f USING (file_id) WHERE v.start >= ? AND v.end <= ? ORDER BY v.start, f.path, v.offset",
+            (start, end)).fetchall()
+
+    # Returns (path, section, offset, length) of the GNSS_VECTOR records that start or end at a point
+    def find_vectors_at_point(self, point_id):
+        return self.connection.execute(
+            "SELECT f.path, 'GNSS_VECTOR', v.offset, v.length FROM vectors v JOIN files f USING (file_id) WHERE v.initial_point_id = ? "
+            "UNION SELECT f.path, 'GNSS_VECTOR', v.offset, v.length FROM vectors v JOIN files f USING (file_id) WHERE v.terminal_point_id = ? ORDER BY 1, 3",
+            (point_id, point_id)).fetchall()
+
+    def find_sessions(self, session_id):
+        return self.connection.execute(
+            "SELECT f.path, 'SESSION', s.offset, s.length FROM sessions s JOIN files f USING (file_id) WHERE s.id = ? ORDER BY f.path, s.offset",
+            (session_id,)).fetchall()
+
+    # Reads the records found by a query straight from their byte offsets, as GVX_XML_Writer keyword arguments
+    def read_records(self, matches):
+        return [GVX_Reader(path).read_record(offset, length) for path, section, offset, length in matches]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_parallel.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete
+
+Description:    This script contains a GVX writer that serializes the POINT and GNSS_VECTOR
+                records of a large document in a pool of processes. The worker processes
+                are forked from the writer so they share its tree without it being
+                copied or pickled, each serializes a range of records and the fragments
+                are written in document order, so the file is byte for byte the one
+                GVX_XML_Writer writes
+----------------------------------------------------------------------------------'''
+import os, multiprocessing
+import xml.etree.ElementTree as ET
+from ngs_xml_writer import GVX_XML_Writer, HEADER_ORDER
+
+# Sections that are split into chunks, the others are small and serialized in the writer's process
+PARALLEL_SECTIONS = ("POINT", "GNSS_VECTOR")
+
+# Root of the document being written, set before the pool is forked so the workers inherit it
+shared_root = None
+
+
+# Serializes a range of elements in one ElementTree call by wrapping them in a placeholder element whose own
+# tags are cut off, elements do not belong to their parent so the document is not changed
+def serialize_elements(elements):
+    if not elements:
+        return b""
+    wrapper = ET.Element("_")
+    wrapper.extend(elements)
+    return ET.tostring(wrapper)[3:-4]
+
+
+def serialize_range(bounds):
+    start, stop = bounds
+    return serialize_elements(shared_root[start:stop])
+
+
+# This is the parallel GVX writer. write_file splits every run of POINT or GNSS_VECTOR records into chunks
+# of chunk_size records and serializes the chunks in processes worker processes, by default one per CPU,
+# then writes each run with a single writelines. With a single process, or on platforms that can not fork,
+# the file is written by GVX_XML_Writer.write_file, documents with fewer than two chunks of records are
+# serialized in the writer's process
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Parallel_Writer(GVX_XML_Writer):
+
+    def __init__(self, filepath, processes = None, chunk_size = 5000):
+        super().__init__(filepath)
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    # Splits the children of the root into runs of the same section, returns (section, start, stop) per run
+    def section_runs(self):
+        runs = []
+        for index, element in enumerate(self.root):
+            if runs and runs[-1][0] == element.tag:
+                runs[-1][2] = index + 1
+            else:
+                runs.append([element.tag, index, index + 1])
+        return runs
+
+    def serialize_chunks(self, ranges):
+        global shared_root
+        if len(ranges) < 2:
+            return [serialize_elements(self.root[start:stop]) for start, stop in ranges]
+        shared_root = self.root
+        try:
+            with multiprocessing.get_context("fork").Pool(min(self.processes, len(ranges))) as pool:
+                return pool.map(serialize_range, ranges, chunksize=1)
+        finally:
+            shared_root = None
+
+    def write_file(self):
+        if self.processes < 2 or "fork" not in multiprocessing.get_all_start_methods():
+            return super().write_file()
+        self.run_pre_write_hooks()
+        self.check_point_coordinates()
+        runs = self.section_runs()
+        ranges = []
+        for section, start, stop in runs:
+            if section in PARALLEL_SECTIONS:
+                ranges.extend((chunk, min(chunk + self.chunk_size, stop)) for chunk in range(start, stop, self.chunk_size))
+        fragments = dict(zip(ranges, self.serialize_chunks(ranges)))
+
+        part_filepath = os.fspath(self.filepath) + ".part"
+        with open(part_filepath, "wb") as gvxFile:
+            gvxFile.write(self.header_bytes())
+            for section, start, stop in runs:
+                if section in HEADER_ORDER:
+                    continue
+                if section in PARALLEL_SECTIONS:
+                    gvxFile.writelines(fragments[(chunk, min(chunk + self.chunk_size, stop))] for chunk in range(start, stop, self.chunk_size))
+                else:
+                    gvxFile.write(serialize_elements(self.root[start:stop]))
+            gvxFile.write(self.footer_bytes())
+        os.replace(part_filepath, self.filepath)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_qc.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete, loop closure check
+                2026/10/19 - Added the vector and coordinate consistency check
+                2026/10/19 - Sources given as path-like objects are read as files
+                2026/10/19 - Points without X, Y, Z are converted from their geodetic coordinates
+                2026/10/19 - Vectors that can not be checked are reported
+
+Description:    This script contains classes with NumPy vectorized quality control checks
+                of the GNSS_VECTOR records held by a GVX_XML_Writer or read from a GVX file
+----------------------------------------------------------------------------------'''
+import os
+import numpy as np
+from gvx_reader import GVX_Reader
+from geodesy import Coordinate_Converter
+
+
+# True when a source is the filepath of a GVX file, a str or path-like object, rather than a GVX_XML_Writer
+def is_filepath(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+# Yields the records of one section of a GVX file, when source is a filepath, or of a GVX_XML_Writer
+def iter_source_records(source, section):
+    if is_filepath(source):
+        return GVX_Reader(source).iter_records((section,))
+    return GVX_Reader().iter_tree_records(source.root, (section,))
+
+
+# Reads the GNSS_VECTOR records of a GVX_XML_Writer, when a writer is given, or of a GVX file into arrays, the
+# point IDs are replaced by integer indexes into point_ids
+def read_vectors(source):
+    records = iter_source_records(source, "GNSS_VECTOR")
+    ids, initial, terminal, values = [], [], [], []
+    for section, record in records:
+        ids.append(record["ID"])
+        initial.append(record["INITIAL_POINT_ID"])
+        terminal.append(record["TERMINAL_POINT_ID"])
+        values.append([record[name] or "nan" for name in ("DX", "DY", "DZ", "SDX", "SDY", "SDZ", "PXY", "PXZ", "PYZ")])
+    values = np.array(values, dtype=np.float64).reshape(-1, 9)
+    point_ids, endpoints = np.unique(np.array(initial + terminal, dtype=object).astype(str), return_inverse=True)
+    endpoints = endpoints.reshape(2, -1)
+    return {
+        "ids": np.array(ids, dtype=object),
+        "point_ids": point_ids,
+        "initial": endpoints[0],
+        "terminal": endpoints[1],
+        "deltas": values[:, 0:3],
+        "covariances": Coordinate_Converter().correlation_to_covariance(values[:, 3:6], values[:, 6:9]),
+    }
+
+
+# Geocentric coordinates of points from an array of X, Y, Z, LATITUDE, LONGITUDE, ELLIPSOIDAL_HEIGHT rows.
+# Points that only have geodetic coordinates are converted on the ellipsoid of their REFERENCE_SYSTEM_ID,
+# points without coordinates are NaN
+def geocentric_coordinates(values, reference_systems):
+    coordinates = values[:, 0:3].copy()
+    geodetic_only = np.isnan(coordinates).any(axis=1) & ~np.isnan(values[:, 3:6]).any(axis=1)
+    if geodetic_only.any():
+        converter = Coordinate_Converter()
+        ellipsoids = np.array([converter.ellipsoid_for_reference_system(reference_system) for reference_system in reference_systems])
+        for ellipsoid in np.unique(ellipsoids[geodetic_only]):
+            selected = geodetic_only & (ellipsoids == ellipsoid)
+            coordinates[selected] = np.column_stack(converter.geodetic_to_geocentric(
+                values[selected, 3], values[selected, 4], values[selected, 5], ellipsoid))
+    return coordinates
+
+
+# Reads the POINT records of a GVX_XML_Writer or of a GVX file into arrays sorted by point ID, coordinates and
+# covariances that are not given are NaN
+def read_points(source):
+    records = iter_source_records(source, "POINT")
+    ids, values, reference_systems = [], [], []
+    for section, record in records:
+        ids.append(record["ID"])
+        values.append([record[name] or "nan" for name in ("X", "Y", "Z", "LATITUDE", "LONGITUDE", "ELLIPSOIDAL_HEIGHT",
+            "SDX", "SDY", "SDZ", "PXY", "PXZ", "PYZ")])
+        reference_systems.append(record["REFERENCE_SYSTEM_ID"])
+    values = np.array(values, dtype=np.float64).reshape(-1, 12)
+    coordinates = geocentric_coordinates(values, reference_systems)
+    ids = np.array(ids, dtype=object).astype(str)
+    order = np.argsort(ids, kind="stable")
+    values = values[order]
+    return {
+        "ids": ids[order],
+        "coordinates": coordinates[order],
+        "covariances": Coordinate_Converter().correlation_to_covariance(values[:, 6:9], values[:, 9:12]),
+    }
+
+
+# This is the loop closure check, it builds a spanning forest of the vector network, every vector that is
+# not in the forest closes exactly one loop with the forest (a fundamental cycle basis). Misclosures come
+# from the accumulated deltas from the root of each tree and the loop covariance from the accumulated
+# covariances and the lowest common ancestor of the vector's end points, so every loop is evaluated at
+# once without enumerating the vectors in it
+#---------------------------------------------------------------------------------------------------------------
+class Loop_Closure_Checker():
+
+    def __init__(self, source):
+        self.vectors = read_vectors(source)
+        self.build_spanning_forest()
+        self.check_loops()
+
+    # Breadth first search of the network, per node it keeps the parent, the vector to the parent, the
+    # direction of that vector, the depth and the order the nodes were reached in
+    def build_spanning_forest(self):
+        vectors = self.vectors
+        node_count = len(vectors["point_ids"])
+        vector_count = len(vectors["ids"])
+        ends = np.concatenate([vectors["initial"], vectors["terminal"]])
+        others = np.concatenate([vectors["terminal"], vectors["initial"]])
+        edge_vectors = np.concatenate([np.arange(vector_count), np.arange(vector_count)])
+        order = np.argsort(ends, kind="stable")
+        adjacency_start = np.searchsorted(ends[order], np.arange(node_count + 1))
+        neighbors = others[order].tolist()
+        neighbor_vectors = edge_vectors[order].tolist()
+        adjacency_start = adjacency_start.tolist()
+
+        parent = [-1] * node_count
+        parent_vector = [-1] * node_count
+        depth = [0] * node_count
+        visited = [False] * node_count
+        levels = []
+        for root in range(node_count):
+            if visited[root]:
+                continue
+            visited[root] = True
+            parent[root] = root
+            frontier = [root]
+            level = 0
+            while frontier:
+                if len(levels) <= level:
+                    levels.append([])
+                levels[level].extend(frontier)
+                next_frontier = []
+                for node in frontier:
+                    for i in range(adjacency_start[node], adjacency_start[node + 1]):
+                        neighbor = neighbors[i]
+                        if not visited[neighbor]:
+                            visited[neighbor] = True
+                            parent[neighbor] = node
+                            parent_vector[neighbor] = neighbor_vectors[i]
+                            depth[neighbor] = level + 1
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+                level += 1
+
+        self.parent = np.array(parent, dtype=np.int64)
+        self.parent_vector = np.array(parent_vector, dtype=np.int64)
+        self.depth = np.array(depth, dtype=np.int64)
+        self.levels = [np.array(level, dtype=np.int64) for level in levels]
+
+        # Accumulate deltas, covariances and lengths from the roots one level at a time
+        self.potential = np.zeros((node_count, 3))
+        self.accumulated_covariance = np.zeros((node_count, 3, 3))
+        self.accumulated_length = np.zeros(node_count)
+        lengths = np.linalg.norm(vectors["deltas"], axis=1)
+        for level in self.levels[1:]:
+            edges = self.parent_vector[level]
+            direction = np.where(vectors["terminal"][edges] == level, 1.0, -1.0)
+            parents = self.parent[level]
+            self.potential[level] = self.potential[parents] + direction[:, None] * vectors["deltas"][edges]
+            self.accumulated_covariance[level] = self.accumulated_covariance[parents] + vectors["covariances"][edges]
+            self.accumulated_length[level] = self.accumulated_length[parents] + lengths[edges]
+
+        in_forest = np.zeros(vector_count, dtype=bool)
+        in_forest[self.parent_vector[self.parent_vector >= 0]] = True
+        self.closing_vectors = np.flatnonzero(~in_forest)
+        self.vector_lengths = lengths
+
+    # Lowest common ancestors of the node pairs by binary lifting, vectorized over all pairs
+    def lowest_common_ancestors(self, u, v):
+        ancestors = [self.parent]
+        max_depth = int(self.depth.max()) if len(self.depth) else 0
+        while (1 << len(ancestors)) <= max_depth:
+            ancestors.append(ancestors[-1][ancestors[-1]])
+        swap = self.depth[u] < self.depth[v]
+        u, v = np.where(swap, v, u), np.where(swap, u, v)
+        difference = self.depth[u] - self.depth[v]
+        for k, ancestor in enumerate(ancestors):
+            lift = (difference >> k) & 1 == 1
+            u = np.where(lift, ancestor[u], u)
+        for ancestor in reversed(ancestors):
+            differ = ancestor[u] != ancestor[v]
+            u = np.where(differ, ancestor[u], u)
+            v = np.where(differ, ancestor[v], v)
+        return np.where(u == v, u, self.parent[u])
+
+    # Misclosure, covariance, chi square statistic and relative misclosure of every fundamental loop
+    def check_loops(self):
+        vectors = self.vectors
+        closing = self.closing_vectors
+        initial = vectors["initial"][closing]
+        terminal = vectors["terminal"][closing]
+        ancestors = self.lowest_common_ancestors(initial, terminal)
+        self.misclosures = vectors["deltas"][closing] - (self.potential[terminal] - self.potential[initial])
+        self.loop_covariances = (vectors["covariances"][closing] + self.accumulated_covariance[initial]
+            + self.accumulated_covariance[terminal] - 2.0 * self.accumulated_covariance[ancestors])
+        self.loop_vector_counts = 1 + self.depth[initial] + self.depth[terminal] - 2 * self.depth[ancestors]
+        self.loop_lengths = (self.vector_lengths[closing] + self.accumulated_length[initial]
+            + self.accumulated_length[terminal] - 2.0 * self.accumulated_length[ancestors])
+        self.chi_square = np.full(len(closing), np.nan)
+        if len(closing):
+            solvable = np.linalg.det(self.loop_covariances) > 0.0
+            solution = np.linalg.solve(self.loop_covariances[solvable], self.misclosures[solvable][..., None])[..., 0]
+            self.chi_square[solvable] = np.einsum("ij,ij->i", self.misclosures[solvable], solution)
+        self.misclosure_lengths = np.linalg.norm(self.misclosures, axis=1)
+        self.ppm = self.misclosure_lengths / np.where(self.loop_lengths > 0.0, self.loop_lengths, np.nan) * 1e6
+
+    # Vector IDs around the loop closed by a vector, from its initial point through the tree and back
+    def loop_vector_ids(self, vector):
+        initial = self.vectors["initial"][vector]
+        terminal = self.vectors["terminal"][vector]
+        ancestor = self.lowest_common_ancestors(np.array([initial]), np.array([terminal]))[0]
+        up_path, down_path = [], []
+        node = terminal
+        while node != ancestor:
+            up_path.append(self.parent_vector[node])
+            node = self.parent[node]
+        node = initial
+        while node != ancestor:
+            down_path.append(self.parent_vector[node])
+            node = self.parent[node]
+        path = [vector] + up_path + list(reversed(down_path))
+        return [self.vectors["ids"][i] for i in path]
+
+    # Report of the worst loops, ranked by the chi square statistic of the misclosure or by "ppm"
+    def worst_loops(self, count = 10, rank_by = "chi_square"):
+        values = self.chi_square if rank_by == "chi_square" else self.ppm
+        ranked = np.argsort(-np.nan_to_num(values, nan=-np.inf), kind="stable")[:count]
+        report = []
+        for loop in ranked:
+            vector = self.closing_vectors[loop]
+            report.append({
+                "closing_vector_id": self.vectors["ids"][vector],
+                "vector_ids": self.loop_vector_ids(vector),
+                "vector_count": int(self.loop_vector_counts[loop]),
+                "misclosure": self.misclosures[loop].tolist(),
+                "misclosure_sigma": np.sqrt(np.diagonal(self.loop_covariances[loop])).tolist(),
+                "misclosure_length": float(self.misclosure_lengths[loop]),
+                "loop_length": float(self.loop_lengths[loop]),
+                "ppm": float(self.ppm[loop]),
+                "chi_square": float(self.chi_square[loop]),
+            })
+        return report
+
+
+# This is the vector and coordinate consistency check, every GNSS_VECTOR delta is compared with the difference
+# of the X, Y, Z of its TERMINAL_POINT_ID and INITIAL_POINT_ID POINT records, converted from the geodetic
+# coordinates for points without X, Y, Z. Vectors are joined to points through integer indexes and all
+# residuals are computed at once. Residuals are normalized by the vector sigmas combined with the point
+# sigmas where the points have a CORRELATION_MATRIX. Vectors whose points are missing or have no coordinates
+# can not be checked, they are listed in unchecked and reported after the outliers
+#---------------------------------------------------------------------------------------------------------------
+class Vector_Consistency_Checker():
+
+    def __init__(self, source, threshold = 3.0):
+        self.threshold = threshold
+        self.vectors = read_vectors(source)
+        self.points = read_points(source)
+        self.check_vectors()
+
+    def check_vectors(self):
+        vectors = self.vectors
+        points = self.points
+        # Index of the POINT record of every point ID used by the vectors, -1 when there is none
+        index = np.searchsorted(points["ids"], vectors["point_ids"])
+        index = np.minimum(index, max(len(points["ids"]) - 1, 0))
+        found = (points["ids"][index] == vectors["point_ids"]) if len(points["ids"]) else np.zeros(len(index), dtype=bool)
+        point_index = np.where(found, index, -1)
+        initial = point_index[vectors["initial"]]
+        terminal = point_index[vectors["terminal"]]
+        coordinates = np.vstack([points["coordinates"], np.full((1, 3), np.nan)])
+        point_covariances = np.nan_to_num(np.concatenate([points["covariances"], np.zeros((1, 3, 3))]))
+
+        self.missing_points = (initial < 0) | (terminal < 0)
+        self.residuals = vectors["deltas"] - (coordinates[terminal] - coordinates[initial])
+        self.unchecked = np.flatnonzero(np.isnan(self.residuals).any(axis=1))
+        covariances = vectors["covariances"] + point_covariances[initial] + point_covariances[terminal]
+        self.sigmas = np.sqrt(np.einsum("...ii->...i", covariances))
+        self.normalized_residuals = self.residuals / np.where(self.sigmas > 0.0, self.sigmas, np.nan)
+        self.largest_normalized_residuals = np.nanmax(np.abs(self.normalized_residuals), axis=1, initial=0.0)
+        self.outliers = np.flatnonzero(self.largest_normalized_residuals > self.threshold)
+
+    # Report of the outlying vectors, largest normalized residual first, followed by the vectors that could not
+    # be checked. The status of each is "outlier", "missing point" or "no coordinates"
+    def report(self):
+        ranked = self.outliers[np.argsort(-self.largest_normalized_residuals[self.outliers], kind="stable")]
+        outliers = set(ranked.tolist())
+        return [{
+            "vector_id": self.vectors["ids"][vector],
+            "initial_point_id": self.vectors["point_ids"][self.vectors["initial"][vector]],
+            "terminal_point_id": self.vectors["point_ids"][self.vectors["terminal"][vector]],
+            "status": "outlier" if vector in outliers else "missing point" if self.missing_points[vector] else "no coordinates",
+            "residual": self.residuals[vector].tolist(),
+            "sigma": self.sigmas[vector].tolist(),
+            "normalized_residual": self.normalized_residuals[vector].tolist(),
+            } for vector in np.concatenate([ranked, self.unchecked]).tolist()]
+
+
+# Returns a GVX_XML_Writer pre write hook that runs the consistency check on the records held by the writer
+# and raises an exception naming the outlying vectors, and the vectors that could not be checked unless
+# allow_unchecked is True, add it with writer.add_pre_write_hook
+def vector_consistency_hook(threshold = 3.0, allow_unchecked = False):
+    def check(writer):
+        checker = Vector_Consistency_Checker(writer, threshold)
+        report = checker.report()
+        outliers = [entry["vector_id"] for entry in report if entry["status"] == "outlier"]
+        if outliers:
+            raise Exception("{} GNSS vectors do not match their point coordinates within {} sigma: {}".format(
+                len(outliers), threshold, ", ".join(str(ID) for ID in outliers[:20])))
+        if len(checker.unchecked) and not allow_unchecked:
+            raise Exception("{} GNSS vectors can not be checked, their points are missing or have no coordinates: {}".format(
+                len(checker.unchecked), ", ".join(str(entry["vector_id"]) for entry in report[:20])))
+    return check
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+'''----------------------------------------------------------------------------------
+Source Name:    gvx_reader.py
+Version:        Python 3.7
+
+Updates:        2026/10/19 - V.I complete, section offsets for appending to a GVX
+                2026/10/19 - Added streaming record parsing into GVX_XML_Writer keyword arguments
+                2026/10/19 - Added record byte offsets and reading single records by offset
+                2026/10/19 - Added the map of sections to writer methods
+
+Description:    This script contains a class to read existing GVX files without building
+                the whole document in memory
+----------------------------------------------------------------------------------'''
+import mmap, re
+import xml.etree.ElementTree as ET
+from ngs_xml_writer import HEADER_ORDER, GVX_RECORD_ORDER
+
+# Element paths of every field of every section, relative to the section element, keyed by the name of the
+# GVX_XML_Writer add_* argument that writes it. A parsed record can be passed straight back to the writer
+#---------------------------------------------------------------------------------------------------------------
+SECTION_FIELDS = {
+    "SOURCE_DATA": {
+        "source_NAME": "NAME",
+        "source_CREATED_DATE": "CREATED_DATE",
+        "application_NAME": "APPLICATION/NAME",
+        "application_VERSION": "APPLICATION/VERSION",
+        "application_MANUFACTURER": "APPLICATION/MANUFACTURER",
+        "application_MANUFACTURER_URL": "APPLICATION/MANUFACTURER_URL",
+        "converted_by_SOFTWARE_NAME": "CONVERTED_BY/SOFTWARE_NAME",
+        "converted_by_VERSION": "CONVERTED_BY/VERSION",
+        "converted_by_SOFTWARE_URL": "CONVERTED_BY/SOFTWARE_URL",
+        "converted_by_CONVERTED_DATE": "CONVERTED_BY/CONVERTED_DATE",
+    },
+    "PROJECT_INFORMATION": {
+        "TITLE": "TITLE",
+        "EMAIL_ADDRESS": "EMAIL_ADDRESS",
+        "PARTY_CHIEF": "PARTY_CHIEF",
+        "AGENCY": "AGENCY",
+        "START_DATE": "START_DATE",
+        "END_DATE": "END_DATE",
+        "REMARK": "REMARK",
+    },
+    "REFERENCE_SYSTEM": {
+        "ID": "ID",
+        "CODE": "CODE",
+        "NAME": "NAME",
+        "REMARK": "REMARK",
+        "linear_unit_NAME": "LINEAR_UNIT/NAME",
+        "linear_unit_SIGNIFICANT_DIGITS": "LINEAR_UNIT/SIGNIFICANT_DIGITS",
+        "linear_unit_CONVERSION_FACTOR": "LINEAR_UNIT/CONVERSION_FACTOR",
+        "angular_unit_NAME": "ANGULAR_UNIT/NAME",
+        "angular_unit_SIGNIFICANT_DIGITS": "ANGULAR_UNIT/SIGNIFICANT_DIGITS",
+        "angular_unit_CONVERSION_FACTOR": "ANGULAR_UNIT/CONVERSION_FACTOR",
+    },
+    "EQUIPMENT": {
+        "ID": "ID",
+        "receiver_TYPE": "RECEIVER/TYPE",
+        "receiver_SERIAL_NUMBER": "RECEIVER/SERIAL_NUMBER",
+        "receiver_FIRMWARE_VERSION": "RECEIVER/FIRMWARE_VERSION",
+        "antenna_TYPE": "ANTENNA/TYPE",
+        "antenna_CALIBRATION_TYPE": "ANTENNA/CALIBRATION_TYPE",
+        "antenna_CALIBRATION_SOURCE": "ANTENNA/CALIBRATION_SOURCE",
+        "antenna_SERIAL_NUMBER": "ANTENNA/SERIAL_NUMBER",
+    },
+    "SURVEY_SETUP": {
+        "ID": "ID",
+        "SOLUTION_TYPE": "SOLUTION_TYPE",
+        "OPERATOR": "OPERATOR",
+        "software_NAME": "PROCESSING_SOFTWARE/NAME",
+        "software_VERSION": "PROCESSING_SOFTWARE/VERSION",
+        "software_URL": "PROCESSING_SOFTWARE/SOFTWARE_URL",
+        "CORRECTOR_FORMAT": "CORRECTOR_FORMAT",
+        "rtk_NAME": "NETWORKRTK/NAME",
+        "rtk_MOUNT_POINT": "NETWORKRTK/MOUNT_POINT",
+        "rtk_TYPE": "NETWORKRTK/TYPE",
+        "rtk_IP_ADDRESS": "NETWORKRTK/IP_ADDRESS",
+        "rtk_IP_PORT": "NETWORKRTK/IP_PORT",
+        "REMARK": "REMARK",
+    },
+    "POINT": {
+        "ID": "ID",
+        "NAME": "NAME",
+        "CODE": "CODE",
+        "EQUIPMENT_ID": "EQUIPMENT_ID",
+        "ARP_HEIGHT": "ARP_HEIGHT",
+        "POINT_TYPE": "POINT_TYPE",
+        "NETWORK_LOCATION": "NETWORK_LOCATION",
+        "TILT_COMPENSATOR": "TILT_COMPENSATOR",
+        "REFERENCE_SYSTEM_ID": "COORDINATES/REFERENCE_SYSTEM_ID",
+        "EPOCH": "COORDINATES/EPOCH",
+        "LATITUDE": "COORDINATES/GEODETIC_COORDINATES/LATITUDE",
+        "LONGITUDE": "COORDINATES/GEODETIC_COORDINATES/LONGITUDE",
+        "ELLIPSOIDAL_HEIGHT": "COORDINATES/GEODETIC_COORDINATES/ELLIPSOIDAL_HEIGHT",
+        "X": "COORDINATES/GEOCENTRIC_COORDINATES/X",
+        "Y": "COORDINATES/GEOCENTRIC_COORDINATES/Y",
+        "Z": "COORDINATES/GEOCENTRIC_COORDINATES/Z",
+        "SDN": "COORDINATES/CORRELATION_MATRIX_LOCAL/SDN",
+        "SDE": "COORDINATES/CORRELATION_MATRIX_LOCAL/SDE",
+        "SDU": "COORDINATES/CORRELATION_MATRIX_LOCAL/SDU",
+        "PNE": "COORDINATES/CORRELATION_MATRIX_LOCAL/PNE",
+        "PNU": "COORDINATES/CORRELATION_MATRIX_LOCAL/PNU",
+        "PEU": "COORDINATES/CORRELATION_MATRIX_LOCAL/PEU",
+        "SDX": "COORDINATES/CORRELATION_MATRIX/SDX",
+        "SDY": "COORDINATES/CORRELATION_MATRIX/SDY",
+        "SDZ": "COORDINATES/CORRELATION_MATRIX/SDZ",
+        "PXY": "COORDINATES/CORRELATION_MATRIX/PXY",
+        "PXZ": "COORDINATES/CORRELATION_MATRIX/PXZ",
+        "PYZ": "COORDINATES/CORRELATION_MATRIX/PYZ",
+    },
+    "GNSS_VECTOR": {
+        "ID": "ID",
+        "INITIAL_POINT_ID": "INITIAL_POINT_ID",
+        "TERMINAL_POINT_ID": "TERMINAL_POINT_ID",
+        "SURVEY_SETUP_ID": "SURVEY_SETUP_ID",
+        "START": "OBSERVATION_TIME/START",
+        "END": "OBSERVATION_TIME/END",
+        "UTC_OFFSET": "OBSERVATION_TIME/UTC_OFFSET",
+        "LEAP_SECONDS": "OBSERVATION_TIME/LEAP_SECONDS",
+        "EPOCHS_USED": "QUALITY_CONTROL/EPOCHS_USED",
+        "ELEVATION": "QUALITY_CONTROL/MASK/ELEVATION",
+        "PDOP_MASK": "QUALITY_CONTROL/MASK/PDOP_MASK",
+        "RMS": "QUALITY_CONTROL/RMS",
+        "GDOP": "QUALITY_CONTROL/DILUTION_PRECISION/GDOP",
+        "HDOP": "QUALITY_CONTROL/DILUTION_PRECISION/HDOP",
+        "PDOP": "QUALITY_CONTROL/DILUTION_PRECISION/PDOP",
+        "TDOP": "QUALITY_CONTROL/DILUTION_PRECISION/TDOP",
+        "VDOP": "QUALITY_CONTROL/DILUTION_PRECISION/VDOP",
+        "satellite_TOTAL": "QUALITY_CONTROL/SATELLITE_USED/TOTAL",
+        "GPS": "QUALITY_CONTROL/SATELLITE_USED/GPS",
+        "GLONASS": "QUALITY_CONTROL/SATELLITE_USED/GLONASS",
+        "GALILEO": "QUALITY_CONTROL/SATELLITE_USED/GALILEO",
+        "QZSS": "QUALITY_CONTROL/SATELLITE_USED/QZSS",
+        "BEIDOU": "QUALITY_CONTROL/SATELLITE_USED/BEIDOU",
+        "orbit_TYPE": "QUALITY_CONTROL/ORBIT/TYPE",
+        "orbit_SOURCE": "QUALITY_CONTROL/ORBIT/SOURCE",
+        "REFERENCE_SYSTEM_ID": "QUALITY_CONTROL/ORBIT/REFERENCE_SYSTEM_ID",
+        "DOWNLOAD_DATE": "QUALITY_CONTROL/ORBIT/DOWNLOAD_DATE",
+        "CORRECTOR_AGE": "QUALITY_CONTROL/CORRECTOR_AGE",
+        "DX": "QUALITY_CONTROL/ECEF_DELTAS/DX",
+        "DY": "QUALITY_CONTROL/ECEF_DELTAS/DY",
+        "DZ": "QUALITY_CONTROL/ECEF_DELTAS/DZ",
+        "SDX": "QUALITY_CONTROL/CORRELATION_MATRIX/SDX",
+        "SDY": "QUALITY_CONTROL/CORRELATION_MATRIX/SDY",
+        "SDZ": "QUALITY_CONTROL/CORRELATION_MATRIX/SDZ",
+        "PXY": "QUALITY_CONTROL/CORRELATION_MATRIX/PXY",
+        "PXZ": "QUALITY_CONTROL/CORRELATION_MATRIX/PXZ",
+        "PYZ": "QUALITY_CONTROL/CORRELATION_MATRIX/PYZ",
+    },
+    "SESSION": {
+        "START": "SESSION_TIME/START",
+        "END": "SESSION_TIME/END",
+        "UTC_OFFSET": "SESSION_TIME/UTC_OFFSET",
+        "LEAP_SECONDS": "SESSION_TIME/LEAP_SECONDS",
+    },
+}
+
+# The same maps keyed by element path, used when walking a record
+SECTION_PATHS = {section: {path: name for name, path in fields.items()} for section, fields in SECTION_FIELDS.items()}
+
+# Name of the GVX_XML_Writer method that writes each section
+SECTION_METHODS = {
+    "SOURCE_DATA": "add_source_data",
+    "PROJECT_INFORMATION": "add_project_information",
+    "REFERENCE_SYSTEM": "add_reference_system",
+    "EQUIPMENT": "add_equipment",
+    "SURVEY_SETUP": "add_survey_setup",
+    "POINT": "add_point",
+    "GNSS_VECTOR": "add_gnss_vector",
+    "SESSION": "add_session",
+}
+
+# Start tag of any section element
+SECTION_START_PATTERN = re.compile(b"<(" + b"|".join(section.encode("ascii") for section in HEADER_ORDER + GVX_RECORD_ORDER) + b")[ \t\r\n/>]")
+
+
+class GVX_Reader():
+    def __init__(self, filepath = None):
+        self.filepath = filepath
+
+    def collect_fields(self, element, prefix, paths, record):
+        for child in element:
+            path = prefix + child.tag
+            if len(child):
+                self.collect_fields(child, path + "/", paths, record)
+            elif path in paths:
+                record[paths[path]] = child.text
+
+    # Returns a dictionary of the add_* keyword arguments that reproduce a section element, fields that
+    # are empty are None. The SESSION attributes and CCM_BLOCK list are read into the same names
+    # add_session takes, VECTOR_ID_COL is read back into vec_id_row to mirror add_session
+    def record_from_element(self, element):
+        record = dict.fromkeys(SECTION_FIELDS[element.tag])
+        if element.tag == "SESSION":
+            record["ID"] = element.get("ID")
+            record["TOTAL_VECTORS"] = element.get("TOTAL_VECTORS")
+            ccm = element.find("CROSS_CORRELATION_MATRIX")
+            record["ORDER"] = ccm.get("ORDER") if ccm is not None else None
+            record["CCM_BLOCK"] = [{
+                "vec_id_row": block.get("VECTOR_ID_COL"),
+                "vec_id_col": block.get("VECTOR_ID_ROW"),
+                "correlations": (block.findtext("CORRELATIONS") or "").split(",")}
+                for block in element.iter("CCM_BLOCK")]
+        self.collect_fields(element, "", SECTION_PATHS[element.tag], record)
+        return record
+
+    # Yields (section, record) for the section elements of an in memory document, e.g. the root of a
+    # GVX_XML_Writer, optionally limited to the given sections
+    def iter_tree_records(self, root, sections = None):
+        for element in root:
+            if element.tag in SECTION_FIELDS and (sections is None or element.tag in sections):
+                yield element.tag, self.record_from_element(element)
+
+    # Yields (section, record) for the section elements of the file in document order, optionally limited to
+    # the given sections. The file is parsed incrementally and every record is released once it is read so
+    # memory use does not depend on the size of the file
+    def iter_records(self, sections = None):
+        depth = 0
+        root = None
+        for event, element in ET.iterparse(self.filepath, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                if element.tag in SECTION_FIELDS and (sections is None or element.tag in sections):
+                    yield element.tag, self.record_from_element(element)
+                root.clear()
+
+    # Returns a dictionary with the byte offset just past the last element of every section found in the
+    # file and the offset of the closing root tag under "GVX". The header elements occur once so they are
+    # searched for from the start of the file, the record sections are searched for from the end of the
+    # file, no per record work is done
+    def section_end_offsets(self):
+        offsets = {}
+        with open(self.filepath, "rb") as gvx_file:
+            with mmap.mmap(gvx_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                root_end = data.rfind(b"</GVX>")
+                if root_end == -1:
+                    raise Exception("{} is not a complete GVX file, no closing GVX tag found".format(self.filepath))
+                offsets["GVX"] = root_end
+                for section in HEADER_ORDER + GVX_RECORD_ORDER:
+                    end_tag = "</{}>".format(section).encode("ascii")
+                    if section in HEADER_ORDER:
+                        position = data.find(end_tag, 0, root_end)
+                    else:
+                        position = data.rfind(end_tag, 0, root_end)
+                    if position != -1:
+                        offsets[section] = position + len(end_tag)
+        return offsets
+
+    # Yields (section, offset, length) of every section element of the file in document order. The file is
+    # memory mapped and each element is skipped with a search for its end tag, nothing is parsed
+    def iter_record_offsets(self):
+        with open(self.filepath, "rb") as gvx_file:
+            with mmap.mmap(gvx_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                position = 0
+                while True:
+                    match = SECTION_START_PATTERN.search(data, position)
+                    if match is None:
+                        break
+                    tag = match.group(1)
+                    start_tag_end = data.find(b">", match.start())
+                    if data[start_tag_end - 1:start_tag_end] == b"/":
+                        end = start_tag_end + 1
+                    else:
+                        end_tag = b"</" + tag + b">"
+                        end = data.find(end_tag, start_tag_end)
+                        if end == -1:
+                            raise Exception("{} element at byte {} of {} is not closed".format(tag.decode("ascii"), match.start(), self.filepath))
+                        end += len(end_tag)
+                    yield tag.decode("ascii"), match.start(), end - match.start()
+                    position = end
+
+    # Reads the record stored at a byte offset found by iter_record_offsets
+    def read_record(self, offset, length):
+        with open(self.filepath, "rb") as gvx_file:
+            gvx_file.seek(offset)
+            return self.record_from_element(ET.fromstring(gvx_file.read(length)))
@@ -7,25 +7,46 @@ Author:         Grant Haynes, National Geodetic Survey, National Oceanic and Atm
 Updates:        2021/02/03 - VI complete
                 2021/03/02 - Added numeric checks for arguments that should be numeric
                 2021/04/15 - Added CVX and LVX writer classes as well as xml parent class
+                2026/10/19 - Added the append_record hook and the streaming GVX writer
+                2026/10/19 - Files are written to a .part file and renamed into place, added the checkpoint writer
+                2026/10/19 - Added fill_point_coordinates, geodetic coordinates are optional when X, Y and Z are given
+                2026/10/19 - Added fill_point_correlation_matrices
+                2026/10/19 - Added pre write hooks
+                2026/10/19 - Added fill_leap_seconds
+                2026/10/19 - Added the spooling GVX writer
+                2026/10/19 - Added the reusable GVX writer
+                2026/10/19 - add_point derives the geodetic coordinates of points given by X, Y and Z only
+                2026/10/19 - Writers that serialize records as they are added refuse pre write hooks
 
 Description:    This module contains classes to create objects to write ngs xml documents including
                 GVX - GNSS Vector Exchange
                 CVX - Classical Vector Exchange
                 LVX - Level Vector Exchange
 ----------------------------------------------------------------------------------'''
+import os, json, shutil, tempfile
 import xml.etree.ElementTree as ET
 from validation_lookup_and_reformatting import String_Checker
 
+# Order of the top level elements in a document as dictated by the schema, the header elements are
+# built once per file, the record elements can repeat
+HEADER_ORDER = ("SOURCE_DATA", "PROJECT_INFORMATION", "REFERENCE_SYSTEM")
+GVX_RECORD_ORDER = ("EQUIPMENT", "SURVEY_SETUP", "POINT", "GNSS_VECTOR", "SESSION")
+
 # This is the Base XML parent class
 # This parent class contains the common tags shared by all the xml formats
 #---------------------------------------------------------------------------------------------------------------
 class Base_XML:
 
+    # Writers that serialize records as they are added set this to False, they keep no tree for a pre write
+    # hook to check
+    keeps_records = True
+
     def __init__(self, filepath):
         self.filepath = filepath                    # Set the filepath attribute here, Added 6/21/2021 GH
         self.string_checker = String_Checker()      # Create a string checker object here, Added 6/21/2021 GH
         self.source_data_records = 0
         self.project_information_records = 0
+        self.pre_write_hooks = []
         
     def initialize_for_file(self, file_type, version):
         self.root = ET.Element(file_type.upper())
@@ -73,6 +94,36 @@ class Base_XML:
         self.rs_NAME = ET.SubElement(self.rs, "NAME")
         self.rs_REMARK = ET.SubElement(self.rs, "REMARK")
 
+    # Registers a function that is called with the writer before the file is written, e.g. a QC check that
+    # raises an exception to stop a bad file from being written
+    def add_pre_write_hook(self, hook):
+        if not self.keeps_records:
+            raise Exception("{} serializes records as they are added, pre write hooks can not run on it".format(type(self).__name__))
+        self.pre_write_hooks.append(hook)
+
+    def run_pre_write_hooks(self):
+        for hook in self.pre_write_hooks:
+            hook(self)
+
+    # Hands a finished top level record (EQUIPMENT, POINT, GNSS_VECTOR etc.) to the document,
+    # writers that stream their output override this to serialize the record instead of keeping it
+    def append_record(self, element):
+        self.root.append(element)
+
+    # Returns the root start tag followed by the SOURCE_DATA, PROJECT_INFORMATION and REFERENCE_SYSTEM
+    # elements, serialized exactly as ElementTree.write would serialize them
+    def header_bytes(self):
+        start_tag = ET.tostring(ET.Element(self.root.tag, self.root.attrib))[:-3] + b">"
+        header = [start_tag]
+        for child in self.root:
+            if child.tag not in HEADER_ORDER:
+                break
+            header.append(ET.tostring(child))
+        return b"".join(header)
+
+    def footer_bytes(self):
+        return "</{}>".format(self.root.tag).encode("ascii")
+
 
 # This is the GVX writer, this class contains a number of methods to construct a GVX xml file
 #---------------------------------------------------------------------------------------------------------------
@@ -254,7 +305,6 @@ class GVX_XML_Writer(Base_XML):
         # Add the EQUIPMENT elements here
         # QC 2/23/2021 GH
         equipment = ET.Element("EQUIPMENT")
-        self.root.append(equipment)
         eqse1 = ET.SubElement(equipment, "ID") 
         receiver = ET.SubElement(equipment, "RECEIVER")
         eqse2 = ET.SubElement(receiver, "TYPE")
@@ -286,6 +336,8 @@ class GVX_XML_Writer(Base_XML):
 
         eqse8.text = str(antenna_SERIAL_NUMBER)
 
+        self.append_record(equipment)
+
     # add_survey_setup function
     # QC GH 3/2/2021
     # ---------------------------------------------------------------------------------------------------------------------------
@@ -307,7 +359,6 @@ class GVX_XML_Writer(Base_XML):
         # Add the SURVEY_SETUP elements here
         # QC 2/23/2021 GH
         surveySetup = ET.Element("SURVEY_SETUP")
-        self.root.append(surveySetup)
         ssse1 = ET.SubElement(surveySetup, "ID")
         ssse2 = ET.SubElement(surveySetup, "SOLUTION_TYPE")
         ssse3 = ET.SubElement(surveySetup, "OPERATOR")
@@ -363,6 +414,8 @@ class GVX_XML_Writer(Base_XML):
         if REMARK:
             ssse13.text = str(REMARK)
 
+        self.append_record(surveySetup)
+
     # add_source_data function
     # QC GH 3/2/2021
     # ---------------------------------------------------------------------------------------------------------------------------
@@ -399,7 +452,6 @@ class GVX_XML_Writer(Base_XML):
         # Add the POINT elements here
         # QC 2/23/2021 GH
         point = ET.Element("POINT")
-        self.root.append(point)
         point_ID = ET.SubElement(point, "ID")
         point_NAME = ET.SubElement(point, "NAME")
         point_CODE = ET.SubElement(point, "CODE")
@@ -468,20 +520,24 @@ class GVX_XML_Writer(Base_XML):
         else:
             raise Exception("EPOCH must be a double")
 
-        if self.string_checker.is_float(LATITUDE):
-            point_LATITUDE.text = str(LATITUDE)
-        else:
-            raise Exception("LATITUDE must be a double")
+        # The geodetic coordinates can be left out when X, Y and Z are given, they are derived from X, Y and Z
+        # below so every writer gets a complete point whether it keeps or streams its records
+        derive_geodetic = LATITUDE is None and LONGITUDE is None and ELLIPSOIDAL_HEIGHT is None and X and Y and Z
+        if not derive_geodetic:
+            if self.string_checker.is_float(LATITUDE):
+                point_LATITUDE.text = str(LATITUDE)
+            else:
+                raise Exception("LATITUDE must be a double")
 
-        if self.string_checker.is_float(LONGITUDE):
-            point_LONGITUDE.text = str(LONGITUDE)
-        else:
-            raise Exception("LONGITUDE must be a double")
+            if self.string_checker.is_float(LONGITUDE):
+                point_LONGITUDE.text = str(LONGITUDE)
+            else:
+                raise Exception("LONGITUDE must be a double")
 
-        if self.string_checker.is_float(ELLIPSOIDAL_HEIGHT):
-            point_ELLIPSOIDAL_HEIGHT.text = str(ELLIPSOIDAL_HEIGHT)
-        else:
-            raise Exception("ELLIPSOIDAL_HEIGHT must be a double")
+            if self.string_checker.is_float(ELLIPSOIDAL_HEIGHT):
+                point_ELLIPSOIDAL_HEIGHT.text = str(ELLIPSOIDAL_HEIGHT)
+            else:
+                raise Exception("ELLIPSOIDAL_HEIGHT must be a double")
 
         if X:
             if self.string_checker.is_float(X):
@@ -500,6 +556,9 @@ class GVX_XML_Writer(Base_XML):
             else:
                 raise Exception("Z must be a double")
 
+        if derive_geodetic:
+            self.derive_geodetic_coordinates(geodeticCoords, X, Y, Z, str(REFERENCE_SYSTEM_ID))
+
         if SDN:
             if self.string_checker.is_float(SDN):
                 point_cml_SDN.text = str(SDN)
@@ -572,6 +631,8 @@ class GVX_XML_Writer(Base_XML):
             else:
                 raise Exception("PYZ must be a double")
 
+        self.append_record(point)
+
     # add_gnss_vector function
     # QC GH 3/2/2021
     # ---------------------------------------------------------------------------------------------------------------------------
@@ -617,7 +678,6 @@ class GVX_XML_Writer(Base_XML):
         # Add the GNSS_VECTOR vector elements here
         # QC 2/23/2021 GH
         gnssVector = ET.Element("GNSS_VECTOR")
-        self.root.append(gnssVector)  
         gvse1 = ET.SubElement(gnssVector, "ID")
         gvse2 = ET.SubElement(gnssVector, "INITIAL_POINT_ID")
         gvse3 = ET.SubElement(gnssVector, "TERMINAL_POINT_ID")
@@ -844,6 +904,8 @@ class GVX_XML_Writer(Base_XML):
         else:
             raise Exception("PYZ must be a double")
 
+        self.append_record(gnssVector)
+
     # add_session function
     # QC GH 3/2/2021
     # ---------------------------------------------------------------------------------------------------------------------------
@@ -860,7 +922,6 @@ class GVX_XML_Writer(Base_XML):
         # Add the SESSION elements here
         # QC 2/23/2021 GH
         session = ET.Element("SESSION")
-        self.root.append(session)       
         sessionTime = ET.SubElement(session, "SESSION_TIME")
         sse1 = ET.SubElement(sessionTime, "START")
         sse2 = ET.SubElement(sessionTime, "END")
@@ -910,7 +971,417 @@ class GVX_XML_Writer(Base_XML):
                 converted_list.append(str(item))
             correlations.text = ",".join(converted_list)
 
+        self.append_record(session)
+
+    # Fills in the GEOCENTRIC_COORDINATES of every POINT that only has GEODETIC_COORDINATES and the other way
+    # around, on the ellipsoid implied by the point's REFERENCE_SYSTEM_ID. All points are converted in one
+    # vectorized pass, requires NumPy
+    # 2026/10/19 - Added
+    def fill_point_coordinates(self):
+        from geodesy import Coordinate_Converter
+        import numpy as np
+        converter = Coordinate_Converter()
+        points = self.root.findall("POINT")
+        if not points:
+            return
+        # Single tag lookups, path lookups go through ElementPath and cost more than the conversion itself
+        coordinates = [point.find("COORDINATES") for point in points]
+        geodetic = [element.find("GEODETIC_COORDINATES") for element in coordinates]
+        geocentric = [element.find("GEOCENTRIC_COORDINATES") for element in coordinates]
+        reference_system_ids = [element.findtext("REFERENCE_SYSTEM_ID") for element in coordinates]
+        reference_system_ellipsoids = {reference_system_id: self.reference_system_ellipsoid(converter, reference_system_id)
+            for reference_system_id in set(reference_system_ids)}
+        ellipsoids = np.array([reference_system_ellipsoids[reference_system_id] for reference_system_id in reference_system_ids])
+
+        def column(elements, index):
+            return np.array([element[index].text or "nan" for element in elements], dtype=np.float64)
+
+        latitude, longitude, height = (column(geodetic, i) for i in range(3))
+        x, y, z = (column(geocentric, i) for i in range(3))
+        has_geodetic = ~(np.isnan(latitude) | np.isnan(longitude) | np.isnan(height))
+        has_geocentric = ~(np.isnan(x) | np.isnan(y) | np.isnan(z))
+
+        for ellipsoid in np.unique(ellipsoids):
+            on_ellipsoid = ellipsoids == ellipsoid
+            to_geocentric = np.flatnonzero(on_ellipsoid & has_geodetic & ~has_geocentric)
+            if len(to_geocentric):
+                coordinates = converter.geodetic_to_geocentric(latitude[to_geocentric], longitude[to_geocentric], height[to_geocentric], ellipsoid)
+                for i, point_x, point_y, point_z in zip(to_geocentric, *coordinates):
+                    geocentric[i][0].text = "{:.4f}".format(point_x)
+                    geocentric[i][1].text = "{:.4f}".format(point_y)
+                    geocentric[i][2].text = "{:.4f}".format(point_z)
+            to_geodetic = np.flatnonzero(on_ellipsoid & has_geocentric & ~has_geodetic)
+            if len(to_geodetic):
+                coordinates = converter.geocentric_to_geodetic(x[to_geodetic], y[to_geodetic], z[to_geodetic], ellipsoid)
+                for i, point_latitude, point_longitude, point_height in zip(to_geodetic, *coordinates):
+                    geodetic[i][0].text = "{:.10f}".format(point_latitude)
+                    geodetic[i][1].text = "{:.10f}".format(point_longitude)
+                    geodetic[i][2].text = "{:.4f}".format(point_height)
+
+    # Ellipsoid of a point's REFERENCE_SYSTEM_ID, the ID of the document's REFERENCE_SYSTEM is looked up by its
+    # code and name as well
+    def reference_system_ellipsoid(self, converter, reference_system_id):
+        rs_ID = getattr(self, "rs_ID", None)
+        if rs_ID is not None and rs_ID.text == reference_system_id:
+            reference_system_id = " ".join(str(text) for text in (rs_ID.text, self.rs_CODE.text, self.rs_NAME.text))
+        return converter.ellipsoid_for_reference_system(reference_system_id)
+
+    # Fills in the GEODETIC_COORDINATES of a single point from its X, Y and Z, requires NumPy for the import of
+    # geodesy but converts with the math module
+    def derive_geodetic_coordinates(self, geodetic, X, Y, Z, reference_system_id):
+        if getattr(self, "coordinate_converter", None) is None:
+            from geodesy import Coordinate_Converter
+            self.coordinate_converter = Coordinate_Converter()
+        ellipsoid = self.reference_system_ellipsoid(self.coordinate_converter, reference_system_id)
+        latitude, longitude, height = self.coordinate_converter.geocentric_to_geodetic_point(float(X), float(Y), float(Z), ellipsoid)
+        geodetic[0].text = "{:.10f}".format(latitude)
+        geodetic[1].text = "{:.10f}".format(longitude)
+        geodetic[2].text = "{:.4f}".format(height)
+
+    # Raises an exception naming the first POINT whose GEODETIC_COORDINATES are incomplete, which add_point
+    # never builds but a pre write hook or direct edits of the tree can leave behind
+    def check_point_coordinates(self, elements = None):
+        for point in (self.root if elements is None else elements):
+            if point.tag != "POINT":
+                continue
+            if not all(element.text for element in point.find("COORDINATES/GEODETIC_COORDINATES")):
+                raise Exception("POINT {} has no complete GEODETIC_COORDINATES, unable to write {}".format(point.findtext("ID"), self.filepath))
+
+    # Fills in the CORRELATION_MATRIX_LOCAL of every POINT that only has a CORRELATION_MATRIX and the other way
+    # around by rotating the covariance matrix at the point's latitude and longitude, a matrix with any element
+    # set is never changed. All points are rotated in one vectorized pass, points without GEODETIC_COORDINATES
+    # are skipped, requires NumPy
+    # 2026/10/19 - Added
+    def fill_point_correlation_matrices(self):
+        from geodesy import Coordinate_Converter
+        import numpy as np
+        converter = Coordinate_Converter()
+        points = self.root.findall("POINT")
+        if not points:
+            return
+        local = [point.find("COORDINATES/CORRELATION_MATRIX_LOCAL") for point in points]
+        geocentric = [point.find("COORDINATES/CORRELATION_MATRIX") for point in points]
+        geodetic = [point.find("COORDINATES/GEODETIC_COORDINATES") for point in points]
+
+        def columns(elements, count):
+            return np.array([[element[index].text or "nan" for index in range(count)] for element in elements], dtype=np.float64)
+
+        local_values = columns(local, 6)
+        geocentric_values = columns(geocentric, 6)
+        position = columns(geodetic, 2)
+        has_position = ~np.isnan(position).any(axis=1)
+        # add_point leaves out correlations of 0, so a matrix is known once its standard deviations are and
+        # its empty correlations are 0. Only matrices with every element empty are filled in
+        has_local = ~np.isnan(local_values[:, :3]).any(axis=1)
+        has_geocentric = ~np.isnan(geocentric_values[:, :3]).any(axis=1)
+        local_empty = np.isnan(local_values).all(axis=1)
+        geocentric_empty = np.isnan(geocentric_values).all(axis=1)
+        local_values[:, 3:] = np.nan_to_num(local_values[:, 3:], nan=0.0)
+        geocentric_values[:, 3:] = np.nan_to_num(geocentric_values[:, 3:], nan=0.0)
+
+        def write_matrices(indexes, matrices, standard_deviations, correlations):
+            for i, point_standard_deviations, point_correlations in zip(indexes, standard_deviations, correlations):
+                for index in range(3):
+                    matrices[i][index].text = "{:.6f}".format(point_standard_deviations[index])
+                    matrices[i][index + 3].text = "{:.6f}".format(point_correlations[index])
+
+        to_local = np.flatnonzero(has_position & has_geocentric & local_empty)
+        if len(to_local):
+            covariances = converter.correlation_to_covariance(geocentric_values[to_local, :3], geocentric_values[to_local, 3:])
+            covariances = converter.geocentric_to_local_covariance(covariances, position[to_local, 0], position[to_local, 1])
+            write_matrices(to_local, local, *converter.covariance_to_correlation(covariances))
+        to_geocentric = np.flatnonzero(has_position & has_local & geocentric_empty)
+        if len(to_geocentric):
+            covariances = converter.correlation_to_covariance(local_values[to_geocentric, :3], local_values[to_geocentric, 3:])
+            covariances = converter.local_to_geocentric_covariance(covariances, position[to_geocentric, 0], position[to_geocentric, 1])
+            write_matrices(to_geocentric, geocentric, *converter.covariance_to_correlation(covariances))
+
+    # Fills in the LEAP_SECONDS of every GNSS_VECTOR and SESSION that has none from the leap second table at
+    # its START, which is GPS time. All records are looked up in one vectorized pass, requires NumPy
+    # 2026/10/19 - Added
+    def fill_leap_seconds(self):
+        from gnss_time import GNSS_Time_Converter
+        import numpy as np
+        elements = [element for element in self.root.findall("GNSS_VECTOR/OBSERVATION_TIME") + self.root.findall("SESSION/SESSION_TIME")
+            if not element.findtext("LEAP_SECONDS")]
+        if not elements:
+            return
+        converter = GNSS_Time_Converter()
+        starts = converter.parse_datetimes([element.findtext("START") or "" for element in elements])
+        leap_seconds = converter.leap_seconds_at_gps(starts).astype(str).tolist()
+        for element, unreadable, count in zip(elements, np.isnat(starts), leap_seconds):
+            if not unreadable:
+                element.find("LEAP_SECONDS").text = count
+
+    # The file is written next to its final path and renamed into place so an interrupted write never
+    # leaves a truncated file at self.filepath
     def write_file(self):
+        self.run_pre_write_hooks()
+        self.check_point_coordinates()
         tree = ET.ElementTree(self.root)
-        with open (self.filepath, "wb") as gvxFile:
-            tree.write(gvxFile)
\ No newline at end of file
+        part_filepath = os.fspath(self.filepath) + ".part"
+        with open (part_filepath, "wb") as gvxFile:
+            tree.write(gvxFile)
+        os.replace(part_filepath, self.filepath)
+
+
+# This is the streaming GVX writer, records are serialized to the file as soon as they are added so
+# memory use does not grow with the size of the document. The header methods (add_source_data,
+# add_project_information, add_reference_system) must be called before the first record and the
+# records must be added in schema order, EQUIPMENT, SURVEY_SETUP, POINT, GNSS_VECTOR, SESSION.
+# Records go to a .part file that is renamed to the filepath by write_file
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Stream_Writer(GVX_XML_Writer):
+
+    keeps_records = False
+
+    def __init__(self, filepath, buffer_size = 1048576):
+        super().__init__(filepath)
+        self.part_filepath = os.fspath(filepath) + ".part"
+        self.buffer_size = buffer_size
+        self.stream = None
+        self.section_index = 0
+        self.records_written = 0
+
+    def open_stream(self):
+        self.stream = open(self.part_filepath, "wb", buffering=self.buffer_size)
+        self.stream.write(self.header_bytes())
+
+    def append_record(self, element):
+        section_index = GVX_RECORD_ORDER.index(element.tag)
+        if section_index < self.section_index:
+            raise Exception("{} record added after {} records, records must be added in schema order".format(
+                element.tag, GVX_RECORD_ORDER[self.section_index]))
+        self.section_index = section_index
+        if self.stream is None:
+            self.open_stream()
+        self.stream.write(ET.tostring(element))
+        self.records_written += 1
+
+    def write_file(self):
+        if self.stream is None:
+            self.open_stream()
+        self.stream.write(self.footer_bytes())
+        self.stream.flush()
+        os.fsync(self.stream.fileno())
+        self.stream.close()
+        os.replace(self.part_filepath, self.filepath)
+
+
+# This is the checkpointing GVX writer, a streaming writer that every checkpoint_interval records flushes
+# the .part file to disk and records how far it got in a .checkpoint file, the IDs written so far are
+# appended to a .ids file. When a job dies a new writer created with resume=True picks the .part file
+# up at the last checkpoint, records covered by the checkpoint are skipped when they are added again,
+# as many times as they were written before, and records_written tells the job how many records it can
+# skip without regenerating them. Records that are not covered are written like GVX_Stream_Writer does
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Checkpoint_Writer(GVX_Stream_Writer):
+
+    def __init__(self, filepath, checkpoint_interval = 10000, resume = False, buffer_size = 1048576):
+        super().__init__(filepath, buffer_size)
+        self.checkpoint_filepath = os.fspath(filepath) + ".checkpoint"
+        self.ids_filepath = os.fspath(filepath) + ".ids"
+        self.checkpoint_interval = checkpoint_interval
+        self.resumed_ids = {section: {} for section in GVX_RECORD_ORDER}
+        self.pending_ids = []
+        self.checkpoint = None
+        if resume and os.path.exists(self.checkpoint_filepath):
+            self.load_checkpoint()
+
+    def load_checkpoint(self):
+        with open(self.checkpoint_filepath, "r") as checkpoint_file:
+            self.checkpoint = json.load(checkpoint_file)
+        with open(self.ids_filepath, "rb") as ids_file:
+            for line in ids_file.read(self.checkpoint["ids_offset"]).decode("utf-8").splitlines():
+                section, ID = line.split("\t", 1)
+                self.resumed_ids[section][ID] = self.resumed_ids[section].get(ID, 0) + 1
+        self.records_written = self.checkpoint["records_written"]
+        self.section_index = self.checkpoint["section_index"]
+
+    def open_stream(self):
+        if self.checkpoint is None:
+            super().open_stream()
+            self.ids_file = open(self.ids_filepath, "wb")
+            return
+        # Resuming, the header must match the one that was written before the checkpoint
+        header = self.header_bytes()
+        self.stream = open(self.part_filepath, "r+b", buffering=self.buffer_size)
+        if self.stream.read(len(header)) != header:
+            self.stream.close()
+            raise Exception("The header of {} does not match the checkpointed file, unable to resume".format(self.filepath))
+        self.stream.seek(self.checkpoint["offset"])
+        self.stream.truncate()
+        self.ids_file = open(self.ids_filepath, "r+b")
+        self.ids_file.seek(self.checkpoint["ids_offset"])
+        self.ids_file.truncate()
+
+    def record_id(self, element):
+        if element.tag == "SESSION":
+            return element.get("ID")
+        return element.findtext("ID")
+
+    # True while the checkpoint covers a record of the section with this ID that has not been added again
+    def is_written(self, section, ID):
+        return self.resumed_ids[section].get(str(ID), 0) > 0
+
+    def append_record(self, element):
+        ID = self.record_id(element)
+        resumed = self.resumed_ids[element.tag]
+        if resumed.get(ID, 0) > 0:
+            resumed[ID] -= 1
+            return
+        super().append_record(element)
+        self.pending_ids.append("{}\t{}\n".format(element.tag, ID).encode("utf-8"))
+        if len(self.pending_ids) >= self.checkpoint_interval:
+            self.write_checkpoint()
+
+    # Everything written so far is forced to disk before the checkpoint that points at it is replaced
+    def write_checkpoint(self):
+        self.ids_file.writelines(self.pending_ids)
+        self.ids_file.flush()
+        os.fsync(self.ids_file.fileno())
+        self.pending_ids = []
+        self.stream.flush()
+        os.fsync(self.stream.fileno())
+        checkpoint = {
+            "offset": self.stream.tell(),
+            "ids_offset": self.ids_file.tell(),
+            "records_written": self.records_written,
+            "section_index": self.section_index,
+        }
+        with open(self.checkpoint_filepath + ".part", "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(self.checkpoint_filepath + ".part", self.checkpoint_filepath)
+        self.checkpoint = checkpoint
+
+    def write_file(self):
+        super().write_file()
+        self.ids_file.close()
+        for filepath in (self.checkpoint_filepath, self.ids_filepath):
+            if os.path.exists(filepath):
+                os.remove(filepath)
+
+
+# This is the spooling GVX writer, records can be added in any order. Each section's records are serialized
+# to their own temporary file as they are added and write_file copies the spools into the document in schema
+# order, so memory use stays flat however the records arrive. The spools are created next to the filepath,
+# or in spool_directory, and are removed when write_file is done
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Spool_Writer(GVX_XML_Writer):
+
+    keeps_records = False
+
+    def __init__(self, filepath, spool_directory = None, buffer_size = 1048576):
+        super().__init__(filepath)
+        self.spool_directory = spool_directory or os.path.dirname(os.path.abspath(filepath))
+        self.buffer_size = buffer_size
+        self.spools = {}
+        self.records_written = 0
+
+    def append_record(self, element):
+        spool = self.spools.get(element.tag)
+        if spool is None:
+            spool = self.spools[element.tag] = tempfile.TemporaryFile(dir=self.spool_directory, buffering=self.buffer_size)
+        spool.write(ET.tostring(element))
+        self.records_written += 1
+
+    # Copies a whole spool to the end of the file, in the kernel with os.sendfile where the platform allows
+    # it and through a large buffer otherwise
+    def copy_spool(self, spool, gvx_file):
+        spool.flush()
+        size = spool.seek(0, os.SEEK_END)
+        offset = 0
+        if hasattr(os, "sendfile"):
+            gvx_file.flush()
+            try:
+                while offset < size:
+                    sent = os.sendfile(gvx_file.fileno(), spool.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            except OSError:
+                pass
+        spool.seek(offset)
+        shutil.copyfileobj(spool, gvx_file, self.buffer_size)
+
+    def write_file(self):
+        part_filepath = os.fspath(self.filepath) + ".part"
+        try:
+            with open(part_filepath, "wb", buffering=self.buffer_size) as gvx_file:
+                gvx_file.write(self.header_bytes())
+                for section in GVX_RECORD_ORDER:
+                    if section in self.spools:
+                        self.copy_spool(self.spools[section], gvx_file)
+                gvx_file.write(self.footer_bytes())
+                gvx_file.flush()
+                os.fsync(gvx_file.fileno())
+            os.replace(part_filepath, self.filepath)
+        finally:
+            for spool in self.spools.values():
+                spool.close()
+            self.spools = {}
+
+
+# This is the reusable GVX writer, for services that write many small files with the same header. The header
+# and the EQUIPMENT and SURVEY_SETUP records added before the first reset or write_file are validated once and
+# serialized once into a skeleton, the bytes every file starts with. reset starts the next file, keeping the
+# skeleton and dropping the records of the last file, so each file only costs its own records. Records are
+# written in the order they were added like GVX_XML_Writer does. Pre write hooks see the whole document but
+# must only change the records of the current file
+#---------------------------------------------------------------------------------------------------------------
+class GVX_Reusable_Writer(GVX_XML_Writer):
+
+    def __init__(self, filepath):
+        super().__init__(filepath)
+        self.skeleton = None
+        self.skeleton_length = 0
+        self.files_written = 0
+
+    # Serializes the header and the leading run of EQUIPMENT and SURVEY_SETUP records, later records belong
+    # to the current file
+    def cache_skeleton(self):
+        if self.source_data_records == 0 or self.project_information_records == 0:
+            raise Exception("Source data and project information must be added before the first file is started")
+        skeleton_length = len(HEADER_ORDER)
+        while skeleton_length < len(self.root) and self.root[skeleton_length].tag in ("EQUIPMENT", "SURVEY_SETUP"):
+            skeleton_length += 1
+        self.skeleton = self.header_bytes() + b"".join(ET.tostring(element) for element in self.root[len(HEADER_ORDER):skeleton_length])
+        self.skeleton_length = skeleton_length
+
+    def add_project_information(self, *args, **kwargs):
+        self.check_header_open()
+        super().add_project_information(*args, **kwargs)
+
+    def add_reference_system(self, *args, **kwargs):
+        self.check_header_open()
+        super().add_reference_system(*args, **kwargs)
+
+    def check_header_open(self):
+        if self.skeleton is not None:
+            raise Exception("The header is already cached, it can not be changed once the first file is started")
+
+    # Starts a new file at filepath, the records added since the skeleton was cached are dropped
+    def reset(self, filepath):
+        if self.skeleton is None:
+            self.cache_skeleton()
+        del self.root[self.skeleton_length:]
+        self.filepath = filepath
+
+    # Returns the current file as bytes, e.g. for services that send the document instead of writing it
+    def document_bytes(self):
+        if self.skeleton is None:
+            self.cache_skeleton()
+        records = [ET.tostring(element) for element in self.root[self.skeleton_length:]]
+        return b"".join([self.skeleton] + records + [self.footer_bytes()])
+
+    def write_file(self):
+        self.run_pre_write_hooks()
+        self.check_point_coordinates(self.root[self.skeleton_length:] if self.skeleton is not None else None)
+        document = self.document_bytes()
+        part_filepath = os.fspath(self.filepath) + ".part"
+        with open(part_filepath, "wb") as gvxFile:
+            gvxFile.write(document)
+        os.replace(part_filepath, self.filepath)
+        self.files_written += 1
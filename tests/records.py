@@ -0,0 +1,25 @@
+# Synthetic records shared by the tests
+
+
+def add_header(writer, reference_system_code = None):
+    writer.add_source_data("Test", "tests", "ngs_xml", "2021-01-01T00:00:00.00", "2021-01-01T00:00:00.00", "1.0")
+    writer.add_project_information("Test", "Party Chief", "NGS", "2021-01-01T00:00:00.00", "2021-01-02T00:00:00.00")
+    writer.add_reference_system("NAD83_2011_2010.00", "NAD 83(2011)", "degree", "meter", CODE=reference_system_code)
+    writer.add_equipment("EQ1", "RECEIVER", "0001", "1.0", "ANTENNA", "0001")
+    writer.add_survey_setup("SS1", "Post-processed", "Operator", "OPUS-Projects", "5.0")
+    return writer
+
+
+def add_point(writer, ID, latitude = "38.1234567890", longitude = "-77.1234567890", height = "12.3456", **kwargs):
+    writer.add_point(ID, "POINT " + str(ID), "EQ1", "1.5", "Adjusted", "NAD83_2011_2010.00", "2010.0",
+        latitude, longitude, height, **kwargs)
+
+
+def add_vector(writer, ID, initial, terminal, dx = "1234.5678", dy = "-2345.6789", dz = "3456.7891"):
+    writer.add_gnss_vector(ID, initial, terminal, "SS1", "2021-01-01T12:00:00.00", "2021-01-01T16:00:00.00",
+        "Precise", "IGS", dx, dy, dz, "0.0012", "0.0015", "0.0020", "0.1234567", "-0.2345678", "0.3456789")
+
+
+def read_bytes(filepath):
+    with open(filepath, "rb") as gvx_file:
+        return gvx_file.read()
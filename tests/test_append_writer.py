@@ -0,0 +1,73 @@
+import os
+import pytest
+from ngs_xml_writer import GVX_XML_Writer
+from gvx_append import GVX_Append_Writer
+from records import add_header, add_point, add_vector, read_bytes
+
+
+def write_original(filepath):
+    writer = add_header(GVX_XML_Writer(filepath))
+    add_point(writer, "1")
+    add_point(writer, "2", height="20.0")
+    add_vector(writer, "V1", "1", "2")
+    writer.write_file()
+    return read_bytes(filepath)
+
+
+def add_new_records(writer):
+    add_point(writer, "3", height="30.0")
+    add_vector(writer, "V2", "2", "3")
+
+
+def test_appended_file_matches_single_pass(tmp_path):
+    filepath = str(tmp_path / "appended.gvx")
+    write_original(filepath)
+    writer = GVX_Append_Writer(filepath)
+    add_new_records(writer)
+    writer.write_file()
+
+    expected = add_header(GVX_XML_Writer(str(tmp_path / "expected.gvx")))
+    add_point(expected, "1")
+    add_point(expected, "2", height="20.0")
+    add_point(expected, "3", height="30.0")
+    add_vector(expected, "V1", "1", "2")
+    add_vector(expected, "V2", "2", "3")
+    expected.write_file()
+    assert read_bytes(filepath) == read_bytes(expected.filepath)
+    assert not os.path.exists(filepath + ".append")
+
+
+def test_failed_rewrite_restores_the_original(tmp_path):
+    filepath = str(tmp_path / "failed.gvx")
+    original = write_original(filepath)
+    writer = GVX_Append_Writer(filepath)
+    add_new_records(writer)
+
+    # Fail after the tail was saved and part of the new tail was written
+    def fail(source, destination, length):
+        destination.write(b"<POINT>partial")
+        raise OSError("No space left on device")
+    writer.copy_bytes = fail
+    with pytest.raises(OSError):
+        writer.write_file()
+    assert read_bytes(filepath) == original
+    assert not os.path.exists(filepath + ".append")
+
+
+def test_interrupted_append_is_rolled_back_by_the_next_writer(tmp_path):
+    filepath = str(tmp_path / "crashed.gvx")
+    original = write_original(filepath)
+    writer = GVX_Append_Writer(filepath)
+    tail_start = writer.insertion_offsets()["POINT"]
+    writer.save_tail(tail_start)
+
+    # The process dies halfway through the rewrite, leaving the file spliced and cut short
+    with open(filepath, "r+b") as gvx_file:
+        gvx_file.seek(tail_start)
+        gvx_file.write(b"<POINT><ID>3</ID>")
+        gvx_file.truncate()
+    assert read_bytes(filepath) != original
+
+    GVX_Append_Writer(filepath)
+    assert read_bytes(filepath) == original
+    assert not os.path.exists(filepath + ".append")
@@ -0,0 +1,46 @@
+import pytest
+from ngs_xml_writer import GVX_XML_Writer
+from gvx_binary import GVX_Binary_Writer, GVX_Binary_Reader, gvx_to_binary, binary_to_gvx
+from records import add_header, add_point, add_vector, read_bytes
+
+
+# Records whose values exercise every GVXB value kind, numbers that do not format back to the same text, e.g.
+# "1.50", "-0.000" and "1e3", must come back as written
+def add_records(writer):
+    add_header(writer)
+    add_point(writer, "1", CODE="RÉPÈRE 007", SDX="0.0012", SDY=0.0015, SDZ="2e-3", PXY="-0.1", PXZ=0.25, PYZ="1")
+    add_point(writer, "2", "38.2234567890", "-77.0234567890", "-45.0")
+    add_point(writer, "station 3", X="1115048.5432", Y="-4843938.1111", Z="3983240.2222", TILT_COMPENSATOR=1)
+    add_vector(writer, "V1", "1", "2")
+    add_vector(writer, "V2", "2", "station 3", "0.0", "-0.000", "1e3")
+    writer.add_session("S1", "2", "2021-01-01T12:00:00.00", "2021-01-01T16:00:00.00", "1",
+        [{"vec_id_row": "V1", "vec_id_col": "V2", "correlations": [0.1, "-0.25", 0, "1.50"]}], UTC_OFFSET="-5", LEAP_SECONDS=18)
+    return writer
+
+
+def test_gvx_to_gvxb_and_back_is_byte_identical(tmp_path):
+    source = add_records(GVX_XML_Writer(str(tmp_path / "source.gvx")))
+    source.write_file()
+    gvx_to_binary(source.filepath, str(tmp_path / "source.gvxb"))
+    binary_to_gvx(str(tmp_path / "source.gvxb"), str(tmp_path / "round_trip.gvx"))
+    assert read_bytes(str(tmp_path / "round_trip.gvx")) == read_bytes(source.filepath)
+
+
+def test_binary_writer_matches_xml_writer(tmp_path):
+    expected = add_records(GVX_XML_Writer(str(tmp_path / "expected.gvx")))
+    expected.write_file()
+    writer = add_records(GVX_Binary_Writer(str(tmp_path / "written.gvxb")))
+    writer.write_file()
+    binary_to_gvx(writer.filepath, str(tmp_path / "written.gvx"))
+    assert read_bytes(str(tmp_path / "written.gvx")) == read_bytes(expected.filepath)
+    assert [section for section, record in GVX_Binary_Reader(writer.filepath).iter_records(("SESSION",))] == ["SESSION"]
+
+
+def test_truncated_file_is_refused(tmp_path):
+    writer = add_records(GVX_Binary_Writer(str(tmp_path / "truncated.gvxb")))
+    writer.write_file()
+    content = read_bytes(writer.filepath)
+    with open(writer.filepath, "wb") as binary_file:
+        binary_file.write(content[:-7])
+    with pytest.raises(Exception, match="truncated"):
+        list(GVX_Binary_Reader(writer.filepath).iter_records())
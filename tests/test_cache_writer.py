@@ -0,0 +1,66 @@
+import os
+from ngs_xml_writer import GVX_XML_Writer
+from gvx_cache import GVX_Cached_Writer
+from records import add_header, add_point, add_vector, read_bytes
+
+
+def write_cached(tmp_path, name, reference_system_code = None, cache_size = 1073741824, **point_fields):
+    writer = add_header(GVX_Cached_Writer(str(tmp_path / name), str(tmp_path / "cache"), cache_size),
+        reference_system_code)
+    add_point(writer, "1", **point_fields)
+    add_point(writer, "2", height="20.0")
+    add_vector(writer, "V1", "1", "2")
+    writer.write_file()
+    return writer
+
+
+def write_uncached(tmp_path, name, reference_system_code = None, **point_fields):
+    writer = add_header(GVX_XML_Writer(str(tmp_path / name)), reference_system_code)
+    add_point(writer, "1", **point_fields)
+    add_point(writer, "2", height="20.0")
+    add_vector(writer, "V1", "1", "2")
+    writer.write_file()
+    return read_bytes(str(tmp_path / name))
+
+
+def test_hit_serves_the_same_bytes(tmp_path):
+    first = write_cached(tmp_path, "first.gvx")
+    second = write_cached(tmp_path, "second.gvx")
+    assert first.cache_hit is False
+    assert second.cache_hit is True
+    assert read_bytes(second.filepath) == write_uncached(tmp_path, "expected.gvx")
+
+
+def test_arguments_written_differently_miss(tmp_path):
+    # CODE is always written, None as the text None and "" as an empty element
+    write_cached(tmp_path, "none.gvx", reference_system_code=None)
+    empty = write_cached(tmp_path, "empty.gvx", reference_system_code="")
+    assert empty.cache_hit is False
+    assert read_bytes(empty.filepath) == write_uncached(tmp_path, "expected.gvx", reference_system_code="")
+
+    # Optional correlations are left out when falsy, 0.0 is not written while "0.0" is
+    write_cached(tmp_path, "float.gvx", PNE=0.0)
+    text = write_cached(tmp_path, "text.gvx", PNE="0.0")
+    assert text.cache_hit is False
+    assert read_bytes(text.filepath) == write_uncached(tmp_path, "expected.gvx", PNE="0.0")
+
+
+def test_arguments_written_the_same_hit(tmp_path):
+    write_cached(tmp_path, "float.gvx", SDN=1.5)
+    text = write_cached(tmp_path, "text.gvx", SDN="1.5")
+    assert text.cache_hit is True
+    assert read_bytes(text.filepath) == write_uncached(tmp_path, "expected.gvx", SDN="1.5")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    first = write_cached(tmp_path, "a.gvx", height="1.0")
+    entry_size = os.path.getsize(first.cache_filepath())
+    cache_size = entry_size * 2 + entry_size // 2
+    second = write_cached(tmp_path, "b.gvx", cache_size=cache_size, height="2.0")
+    os.utime(first.cache_filepath(), (0, 0))
+    os.utime(second.cache_filepath(), (1, 1))
+    # Using the first entry again makes the second one the least recently used
+    assert write_cached(tmp_path, "a2.gvx", cache_size=cache_size, height="1.0").cache_hit is True
+    third = write_cached(tmp_path, "c.gvx", cache_size=cache_size, height="3.0")
+    entries = sorted(os.listdir(str(tmp_path / "cache")))
+    assert entries == sorted(os.path.basename(writer.cache_filepath()) for writer in (first, third))
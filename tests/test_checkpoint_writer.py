@@ -0,0 +1,78 @@
+import os, subprocess, sys
+from ngs_xml_writer import GVX_XML_Writer, GVX_Checkpoint_Writer
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Point IDs of the synthetic job, 7 is added twice
+POINT_IDS = [str(i) for i in range(20)] + ["7"]
+
+
+def add_records(writer):
+    writer.add_source_data("Test", "tests", "ngs_xml", "2021-01-01T00:00:00.00", "2021-01-01T00:00:00.00", "1.0")
+    writer.add_project_information("Test", "Party Chief", "NGS", "2021-01-01T00:00:00.00", "2021-01-02T00:00:00.00")
+    writer.add_reference_system("NAD83_2011_2010.00", "NAD 83(2011)", "degree", "meter")
+    writer.add_equipment("EQ1", "RECEIVER", "0001", "1.0", "ANTENNA", "0001")
+    writer.add_survey_setup("SS1", "Post-processed", "Operator", "OPUS-Projects", "5.0")
+    for count, ID in enumerate(POINT_IDS):
+        writer.add_point(ID, "POINT " + str(count), "EQ1", "1.5", "Adjusted", "NAD83_2011_2010.00", "2010.0",
+            "38.1234567890", "-77.1234567890", str(count))
+    for i in range(30):
+        writer.add_gnss_vector(str(i), str(i % 20), str((i + 1) % 20), "SS1", "2021-01-01T12:00:00.00",
+            "2021-01-01T16:00:00.00", "Precise", "IGS", "1234.5678", "-2345.6789", "3456.7891", "0.0012", "0.0015",
+            "0.0020", "0.1234567", "-0.2345678", "0.3456789")
+
+
+# Runs the job in a child process that dies without flushing after the given number of records
+CRASHING_JOB = """
+import os, sys
+sys.path.insert(0, {repository!r})
+sys.path.insert(0, {tests!r})
+from ngs_xml_writer import GVX_Checkpoint_Writer
+from test_checkpoint_writer import add_records
+
+class Crashing_Writer(GVX_Checkpoint_Writer):
+    def append_record(self, element):
+        super().append_record(element)
+        if self.records_written == {crash_after}:
+            os._exit(1)
+
+add_records(Crashing_Writer({filepath!r}, checkpoint_interval=7))
+"""
+
+
+def single_pass(filepath):
+    writer = GVX_XML_Writer(filepath)
+    add_records(writer)
+    writer.write_file()
+    with open(filepath, "rb") as gvx_file:
+        return gvx_file.read()
+
+
+def test_resumed_file_matches_single_pass(tmp_path):
+    expected = single_pass(str(tmp_path / "expected.gvx"))
+    filepath = str(tmp_path / "resumed.gvx")
+    job = CRASHING_JOB.format(repository=REPOSITORY, tests=os.path.dirname(os.path.abspath(__file__)),
+        crash_after=33, filepath=filepath)
+    assert subprocess.run([sys.executable, "-c", job]).returncode == 1
+    assert os.path.exists(filepath + ".checkpoint")
+    assert not os.path.exists(filepath)
+
+    writer = GVX_Checkpoint_Writer(filepath, checkpoint_interval=7, resume=True)
+    assert writer.records_written == 28
+    assert writer.is_written("POINT", "7")
+    add_records(writer)
+    writer.write_file()
+    with open(filepath, "rb") as gvx_file:
+        assert gvx_file.read() == expected
+    assert not os.path.exists(filepath + ".checkpoint")
+    assert not os.path.exists(filepath + ".ids")
+
+
+def test_duplicate_ids_are_written_without_a_checkpoint(tmp_path):
+    expected = single_pass(str(tmp_path / "expected.gvx"))
+    filepath = str(tmp_path / "fresh.gvx")
+    writer = GVX_Checkpoint_Writer(filepath, checkpoint_interval=7)
+    add_records(writer)
+    writer.write_file()
+    with open(filepath, "rb") as gvx_file:
+        assert gvx_file.read() == expected
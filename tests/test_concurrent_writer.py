@@ -0,0 +1,67 @@
+import threading
+import pytest
+from ngs_xml_writer import GVX_XML_Writer
+from gvx_concurrent import GVX_Concurrent_Writer, id_sort_key
+from records import add_header, add_point, read_bytes
+
+# Point IDs handed to the producers, numeric IDs sort by value before the others and 17 is added twice
+POINT_IDS = [str((i * 37) % 250) for i in range(250)] + ["B", "A", "17", "10"]
+
+
+def produce(writer, producers):
+    # Each producer adds every producers-th point, the heights tell the duplicate IDs apart
+    def work(first):
+        for index in range(first, len(POINT_IDS), producers):
+            add_point(writer, POINT_IDS[index], height=str(index))
+    threads = [threading.Thread(target=work, args=(first,)) for first in range(producers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def expected_bytes(filepath, indexes):
+    writer = add_header(GVX_XML_Writer(filepath))
+    for index in indexes:
+        add_point(writer, POINT_IDS[index], height=str(index))
+    writer.write_file()
+    return read_bytes(filepath)
+
+
+@pytest.mark.parametrize("run_size", [7, 100000])
+def test_id_order_across_threads(tmp_path, run_size):
+    writer = add_header(GVX_Concurrent_Writer(str(tmp_path / "concurrent.gvx"), queue_size=16, run_size=run_size))
+    produce(writer, 1)
+    writer.write_file()
+    # A single producer queues in index order, the stable sort keeps duplicate IDs in that order
+    indexes = sorted(range(len(POINT_IDS)), key=lambda index: id_sort_key(POINT_IDS[index]))
+    assert read_bytes(writer.filepath) == expected_bytes(str(tmp_path / "expected.gvx"), indexes)
+
+
+def test_id_order_with_many_producers_and_spilled_runs(tmp_path):
+    writer = add_header(GVX_Concurrent_Writer(str(tmp_path / "concurrent.gvx"), queue_size=16, run_size=7))
+    produce(writer, 4)
+    writer.write_file()
+    # Duplicate IDs come from different producers, so only the order of distinct IDs is deterministic
+    content = read_bytes(writer.filepath).decode("utf-8")
+    written = [part.split("</ID>")[0] for part in content.split("<POINT><ID>")[1:]]
+    assert sorted(written, key=id_sort_key) == written
+    assert sorted(written) == sorted(POINT_IDS)
+
+
+def test_insertion_order(tmp_path):
+    writer = add_header(GVX_Concurrent_Writer(str(tmp_path / "concurrent.gvx"), queue_size=16, order="insertion"))
+    produce(writer, 1)
+    writer.write_file()
+    assert read_bytes(writer.filepath) == expected_bytes(str(tmp_path / "expected.gvx"), range(len(POINT_IDS)))
+
+
+def test_records_after_write_file_are_refused(tmp_path):
+    writer = add_header(GVX_Concurrent_Writer(str(tmp_path / "concurrent.gvx"), queue_size=2))
+    add_point(writer, "1")
+    writer.write_file()
+    for attempt in range(3):
+        with pytest.raises(Exception, match="already been written"):
+            add_point(writer, "2")
+    with pytest.raises(Exception, match="already been written"):
+        writer.write_file()
@@ -0,0 +1,40 @@
+from ngs_xml_writer import GVX_XML_Writer
+from gvx_reader import GVX_Reader
+from gvx_duplicates import Duplicate_Point_Checker
+from records import add_header, add_point, add_vector
+
+
+# A is sent in a second time as A2, 2 mm away, V2 runs between the two and only V1 and V3 survive the merge
+def add_records(writer):
+    add_header(writer)
+    add_point(writer, "A", X="1115048.5432", Y="-4843938.1111", Z="3983240.2222")
+    add_point(writer, "B", X="1116048.5432", Y="-4842938.1111", Z="3984240.2222")
+    add_point(writer, "A2", X="1115048.5442", Y="-4843938.1121", Z="3983240.2232")
+    add_vector(writer, "V1", "A", "B")
+    add_vector(writer, "V2", "A", "A2")
+    add_vector(writer, "V3", "B", "A2")
+    return writer
+
+
+def vector_ends(records):
+    return [(record["ID"], record["INITIAL_POINT_ID"], record["TERMINAL_POINT_ID"]) for section, record in records if section == "GNSS_VECTOR"]
+
+
+def test_merge_drops_vectors_between_merged_points(tmp_path):
+    writer = add_records(GVX_XML_Writer(str(tmp_path / "merged.gvx")))
+    checker = Duplicate_Point_Checker(writer)
+    assert checker.merge() == {"A2": "A"}
+    assert checker.dropped_vectors == ["V2"]
+    assert [point.findtext("ID") for point in writer.root.iter("POINT")] == ["A", "B"]
+    assert vector_ends(GVX_Reader().iter_tree_records(writer.root)) == [("V1", "A", "B"), ("V3", "B", "A")]
+
+
+def test_merge_file_drops_vectors_between_merged_points(tmp_path):
+    source = add_records(GVX_XML_Writer(str(tmp_path / "source.gvx")))
+    source.write_file()
+    checker = Duplicate_Point_Checker(source.filepath)
+    assert checker.merge_file(str(tmp_path / "merged.gvx")) == {"A2": "A"}
+    assert checker.dropped_vectors == ["V2"]
+    records = list(GVX_Reader(str(tmp_path / "merged.gvx")).iter_records())
+    assert [record["ID"] for section, record in records if section == "POINT"] == ["A", "B"]
+    assert vector_ends(records) == [("V1", "A", "B"), ("V3", "B", "A")]
@@ -0,0 +1,46 @@
+import pytest
+from ngs_xml_writer import GVX_XML_Writer
+from geodesy import Coordinate_Converter
+from gvx_qc import Vector_Consistency_Checker, vector_consistency_hook
+from records import add_header, add_point, add_vector
+
+# Two marks given only by geodetic coordinates, as add_point requires
+MARKS = {"1": ("38.1234567890", "-77.1234567890", "12.3456"), "2": ("38.2234567890", "-77.0234567890", "45.6789")}
+
+
+def true_delta():
+    converter = Coordinate_Converter()
+    initial, terminal = (converter.geodetic_to_geocentric(*[float(value) for value in MARKS[ID]]) for ID in ("1", "2"))
+    return ["{:.4f}".format(float(end - start)) for start, end in zip(initial, terminal)]
+
+
+def network(tmp_path, vectors):
+    writer = add_header(GVX_XML_Writer(str(tmp_path / "network.gvx")))
+    for ID, (latitude, longitude, height) in MARKS.items():
+        add_point(writer, ID, latitude, longitude, height)
+    for ID, initial, terminal, delta in vectors:
+        add_vector(writer, ID, initial, terminal, *delta)
+    return writer
+
+
+def test_geodetic_only_points_are_checked(tmp_path):
+    delta = true_delta()
+    wrong = [str(float(delta[0]) + 5000.0)] + delta[1:]
+    writer = network(tmp_path, [("V1", "1", "2", delta), ("V2", "1", "2", wrong)])
+    checker = Vector_Consistency_Checker(writer)
+    assert [entry["vector_id"] for entry in checker.report()] == ["V2"]
+    writer.add_pre_write_hook(vector_consistency_hook())
+    with pytest.raises(Exception, match="V2"):
+        writer.write_file()
+
+
+def test_vectors_that_can_not_be_checked_are_reported(tmp_path):
+    writer = network(tmp_path, [("V1", "1", "2", true_delta()), ("V3", "1", "9", true_delta())])
+    report = Vector_Consistency_Checker(writer).report()
+    assert [(entry["vector_id"], entry["status"]) for entry in report] == [("V3", "missing point")]
+    writer.add_pre_write_hook(vector_consistency_hook())
+    with pytest.raises(Exception, match="can not be checked.*V3"):
+        writer.write_file()
+    writer.pre_write_hooks = []
+    writer.add_pre_write_hook(vector_consistency_hook(allow_unchecked=True))
+    writer.write_file()